@@ -13,6 +13,7 @@ from time import sleep, time
 import pyautogui as pag
 
 from rf4s.controller.detection import Detection
+from rf4s.controller.region_memo import get_bounds
 
 MAX_FRICTION_BRAKE = 30
 MIN_FRICTION_BRAKE = 0
@@ -20,6 +21,8 @@ UP = 1
 DOWN = -1
 FRICTION_BRAKE_MONITOR_DELAY = 2
 LOOP_DELAY = 0.04
+TENSION_GAIN = 20  # Notches released per unit of tension above the threshold
+TENSION_DEADBAND = 0.1  # Tension below the threshold that still holds the brake
 
 logger = logging.getLogger("rich")
 
@@ -69,7 +72,7 @@ class FrictionBrake:
         self.cur.value = target
 
     def change(self, increase: bool) -> None:
-        """Increase or decrease the friction brake.
+        """Increase or decrease the friction brake by one notch.
 
         :param increase: Whether to increase the friction brake.
         :type increase: bool
@@ -84,10 +87,36 @@ class FrictionBrake:
                 self.cur.value = max(self.cur.value - 1, MIN_FRICTION_BRAKE)
         sleep(LOOP_DELAY)
 
+    def release(self, excess: float) -> None:
+        """Decrease the friction brake in proportion to the excess tension.
+
+        :param excess: Tension above the threshold, in [0, 1].
+        :type excess: float
+        """
+        for _ in range(max(round(excess * TENSION_GAIN), 1)):
+            self.change(increase=False)
+
+
+def get_excess_tension(detection: Detection) -> float | None:
+    """Get the tension above the threshold of the selected sensitivity.
+
+    :param detection: Detection instance of the game window.
+    :type detection: Detection
+    :return: Difference to the threshold, positive if the tension is too high,
+        None if the tension bar can't be read.
+    :rtype: float | None
+    """
+    tension = detection.get_friction_brake_tension()
+    if tension is None:
+        return None
+    return tension - detection.friction_brake_threshold
+
 
 def monitor_friction_brake(friction_brake: FrictionBrake) -> None:
     """Monitor friction brake bar and change it accordingly.
 
+    The friction brake is released in proportion to how far the tension exceeds
+    the threshold, and tightened one notch at a time while it's clearly below.
     This is used as the target function in multiprocess.Process and must be pickable,
     thus it must be declared as a global function instead of an instance method.
 
@@ -95,13 +124,22 @@ def monitor_friction_brake(friction_brake: FrictionBrake) -> None:
     :type friction_brake: FrictionBrake
     """
     logger.info("Monitoring friction brake")
+    # Capture state is not shared with the parent process, start a new one here,
+    # only the HUD icons and the tension bar are read
+    detection = friction_brake.detection
+    if detection.hud_region is None:
+        detection.start_capture()
+    else:
+        detection.start_capture(
+            get_bounds(detection.hud_region, detection.friction_brake_bar)
+        )
 
     pre_time = time()
     fish_hooked = False
 
     try:
         while True:
-            if not friction_brake.detection.is_fish_hooked_pixel():
+            if not detection.is_fish_hooked_pixel():
                 sleep(FRICTION_BRAKE_MONITOR_DELAY)
                 fish_hooked = False
                 continue
@@ -109,19 +147,22 @@ def monitor_friction_brake(friction_brake: FrictionBrake) -> None:
                 sleep(friction_brake.cfg.FRICTION_BRAKE.START_DELAY)
                 fish_hooked = True
             with friction_brake.lock:
-                if friction_brake.detection.is_friction_brake_high():
-                    friction_brake.change(increase=False)
-                if friction_brake.detection.is_reel_burning():
+                excess = get_excess_tension(detection)
+                if excess is None:  # Fall back to the pixel at the threshold
+                    if detection.is_friction_brake_high():
+                        friction_brake.change(increase=False)
+                elif excess > 0:
+                    friction_brake.release(excess)
+                if detection.is_reel_burning():
                     logger.info("Reel burning detected, decreasing friction brake")
                     friction_brake.change(increase=False)
-                else:
+                elif excess is None or excess < -TENSION_DEADBAND:
                     cur_time = time()
-                    if (
-                        cur_time - pre_time
-                        < friction_brake.cfg.FRICTION_BRAKE.INCREASE_DELAY
-                    ):
-                        continue
-                    pre_time = cur_time
-                    friction_brake.change(increase=True)
+                    increase_delay = friction_brake.cfg.FRICTION_BRAKE.INCREASE_DELAY
+                    if cur_time - pre_time >= increase_delay:
+                        pre_time = cur_time
+                        friction_brake.change(increase=True)
+            # Every branch waits here, outside the lock, instead of spinning
+            sleep(LOOP_DELAY)
     except KeyboardInterrupt:
         pass
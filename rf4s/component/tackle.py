@@ -19,7 +19,8 @@ import win32api
 import win32con
 
 from rf4s import exceptions, utils
-from rf4s.controller.detection import Detection
+from rf4s.controller.detection import RAINBOW_LINE_LENGTH, Detection
+from rf4s.controller.planner import get_planner
 from rf4s.controller.timer import Timer
 
 logger = logging.getLogger("rich")
@@ -30,6 +31,7 @@ CAST_SCALE = 0.4  # 25% / 0.4s
 # BASE_DELAY + LOOP_DELAY >= 2.2 to trigger clicklock
 BASE_DELAY = 1.2
 LOOP_DELAY = 1
+MIN_LOOP_DELAY = 0.1  # Shortest delay when checking at a predicted time
 
 ANIMATION_DELAY = 1
 
@@ -44,8 +46,18 @@ SINK_DELAY = 2
 
 
 OFFSET = 100
+FAVORITE_ITEM_OFFSET = (-70, 190)  # From the favorite star to the item
 NUM_OF_MOVEMENT = 4
 
+# Exceptions raised when a check is the outcome of a chain
+CHECK_ERRORS = {
+    "fish_hooked": exceptions.FishHookedError,
+    "keep": exceptions.FishCapturedError,
+    "line_at_end": exceptions.LineAtEndError,
+    "line_snagged": exceptions.LineSnaggedError,
+    "lure_is_broken": exceptions.LureBrokenError,
+}
+
 
 class Tackle:
     """Class for all tackle-dependent methods.
@@ -59,6 +71,12 @@ class Tackle:
         detection (Detection): Detection instance for in-game state checks.
         landing_net_out (bool): Whether the landing net is deployed.
         available (bool): Whether the tackle is available for use.
+        finished_names (tuple[str, ...]): Templates that indicate the end of
+            retrieval.
+        plans (dict[str, ProbePlan]): Compiled checks of the polling stages, keyed
+            by stage name.
+        planners (dict[str, CheckPlanner]): Planners of the polling stages, keyed
+            by stage name.
     """
 
     def __init__(self, cfg, timer: Timer, detection: Detection):
@@ -77,6 +95,23 @@ class Tackle:
         self.landing_net_out = False  # For telescopic pull
         self.available = True
 
+        # Casting has no checks, and the species is matched when handling a fish
+        self.finished_names = detection.get_retrieval_finished_templates()
+        snag = ["line_snagged"] if cfg.SCRIPT.SNAG_DETECTION else []
+        spool = ["line_at_end"] if cfg.SCRIPT.SPOOLING_DETECTION else []
+        self.plans, self.planners = {}, {}
+        self._compile(
+            "reset",
+            ["ready"],
+            ["fish_hooked"],
+            ["keep"],
+            *([probe] for probe in spool + snag),
+            ["lure_is_broken"],
+        )
+        # A snagged line takes precedence over the keep dialog
+        self._compile("retrieve", self.finished_names, snag, ["keep"], spool)
+        self._compile("pull", snag, ["keep"])
+
     @staticmethod
     def _check_status(func):
         def wrapper(self, *args, **kwargs):
@@ -103,22 +138,59 @@ class Tackle:
         logger.info("Resetting tackle")
         i = RESET_TIMEOUT
         while i > 0:
-            if self.detection.is_tackle_ready():
+            outcome = self._run_checks("reset")
+            if outcome == "ready":
                 return
-            if self.detection.is_fish_hooked():
-                raise exceptions.FishHookedError
-            if self.detection.is_fish_captured():
-                raise exceptions.FishCapturedError
-            if self.cfg.SCRIPT.SPOOLING_DETECTION and self.detection.is_line_at_end():
-                raise exceptions.LineAtEndError
-            if self.cfg.SCRIPT.SNAG_DETECTION and self.detection.is_line_snagged():
-                raise exceptions.LineSnaggedError
-            if self.detection.is_lure_broken():
-                raise exceptions.LureBrokenError
+            self._raise_for(outcome)
             i = utils.sleep_and_decrease(i, LOOP_DELAY)
 
         raise TimeoutError
 
+    def _compile(self, stage: str, *groups: list[str]) -> None:
+        """Compile the check chain of a stage in the selected mode.
+
+        :param stage: Name of the stage, e.g., "retrieve".
+        :type stage: str
+        :param groups: Checks grouped by priority, most important first, checks in
+            a group lead to the same action.
+        :type groups: list[str]
+        """
+        priorities = {
+            check: priority for priority, group in enumerate(groups) for check in group
+        }
+        self.plans[stage] = self.detection.compile_plan(stage, priorities)
+        self.planners[stage] = get_planner(
+            f"{self.cfg.SELECTED.MODE}/{stage}", priorities
+        )
+
+    def _run_checks(self, stage: str) -> str | None:
+        """Run the check chain of a stage against one frame.
+
+        Only the region the checks read is captured if there's no background frame.
+
+        :param stage: Name of the stage.
+        :type stage: str
+        :return: The most important positive check, None if all are negative.
+        :rtype: str | None
+        """
+        checks = self.plans[stage].checks
+        with self.detection.snapshot(self.plans[stage].region):
+            return self.planners[stage].run(lambda check: checks[check]())
+
+    def _raise_for(self, outcome: str | None) -> None:
+        """Raise the exception of a check chain outcome, if it has one.
+
+        :param outcome: The most important positive check.
+        :type outcome: str | None
+        :raises exceptions.FishHookedError: A fish is hooked.
+        :raises exceptions.FishCapturedError: A fish is captured.
+        :raises exceptions.LineAtEndError: The line is at its end.
+        :raises exceptions.LineSnaggedError: The line is snagged.
+        :raises exceptions.LureBrokenError: The lure is broken.
+        """
+        if outcome in CHECK_ERRORS:
+            raise CHECK_ERRORS[outcome]
+
     @_check_status
     def cast(self, lock: bool) -> None:
         """Cast the rod, then wait for the lure/bait to fly and sink.
@@ -147,6 +219,7 @@ class Tackle:
     def sink(self) -> None:
         """Sink the lure until an event happens, designed for marine and wakey rig."""
         logger.info("Sinking lure")
+        self.detection.hook_debouncer.reset()
         i = self.cfg.SELECTED.SINK_TIMEOUT
         while i > 0:
             i = utils.sleep_and_decrease(i, LOOP_DELAY)
@@ -155,7 +228,7 @@ class Tackle:
                 sleep(SINK_DELAY)
                 break
 
-            if self.detection.is_fish_hooked_twice():
+            if self.detection.is_fish_hooked_confirmed():
                 pag.click()  # Lock reel
                 return
 
@@ -176,29 +249,41 @@ class Tackle:
         :raises TimeoutError: The loop timed out.
         """
         logger.info("Retrieving fishing line")
+        post_acceleration = self.cfg.SELECTED.POST_ACCELERATION
+        accelerate = post_acceleration == "on" or (
+            post_acceleration == "auto" and first
+        )
+        lift = self.cfg.ARGS.LIFT
+        line_meter = self.detection.line_meter
+        line_meter.reset()
 
         i = RETRIEVAL_TIMEOUT
         while i > 0:
-            if self.detection.is_fish_hooked():
-                if self.cfg.SELECTED.POST_ACCELERATION == "on":
-                    pag.keyDown("shift")
-                elif self.cfg.SELECTED.POST_ACCELERATION == "auto" and first:
+            hooked = self.detection.is_fish_hooked()
+            if hooked:
+                if accelerate:
                     pag.keyDown("shift")
-
-                if self.cfg.ARGS.LIFT:
+                if lift:
                     utils.hold_mouse_button(LIFT_DURATION, button="right")
 
-            if self.detection.is_retrieval_finished():
+            # Evaluate after lifting so that the checks below see the current screen
+            outcome = self._run_checks("retrieve")
+            if outcome in self.finished_names:
                 sleep(0 if self.cfg.ARGS.RAINBOW_LINE else 2)
                 return
-
-            elif self.detection.is_fish_captured():
-                raise exceptions.FishCapturedError
-            elif self.cfg.SCRIPT.SPOOLING_DETECTION and self.detection.is_line_at_end():
-                raise exceptions.LineAtEndError
-            elif self.cfg.SCRIPT.SNAG_DETECTION and self.detection.is_line_snagged():
-                raise exceptions.LineSnaggedError
-            i = utils.sleep_and_decrease(i, LOOP_DELAY)
+            self._raise_for(outcome)
+            # Check again when the line meter is predicted to reach the end
+            eta = line_meter.get_eta(RAINBOW_LINE_LENGTH)
+            delay = LOOP_DELAY
+            if eta is not None:
+                delay = max(min(eta, LOOP_DELAY), MIN_LOOP_DELAY)
+            elif not line_meter.ready:
+                if hooked:  # The fish can pull the line out, restart the countdown
+                    line_meter.reset()
+                elif self.detection.learn_line_meter():
+                    # Sample the countdown densely so that no digit is skipped
+                    delay = MIN_LOOP_DELAY
+            i = utils.sleep_and_decrease(i, delay)
 
         raise TimeoutError
 
@@ -240,13 +325,14 @@ class Tackle:
         :raises exceptions.TimeoutError: The loop timed out.
         """
         logger.info("Pirking")
+        self.detection.hook_debouncer.reset()
 
         i = self.cfg.SELECTED.PIRK_TIMEOUT
         while i > 0:
             if self.cfg.SELECTED.PIRK_RETRIEVAL and self.detection.is_tackle_ready():
                 return
 
-            if self.detection.is_fish_hooked_twice():
+            if self.detection.is_fish_hooked_confirmed():
                 pag.click()
                 return
 
@@ -283,9 +369,10 @@ class Tackle:
         :raises exceptions.TimeoutError: The loop timed out.
         """
         locked = True  # Reel is locked after tackle.sink()
+        self.detection.hook_debouncer.reset()
         i = self.cfg.SELECTED.ELEVATE_TIMEOUT
         while i > 0:
-            if self.detection.is_fish_hooked_twice():
+            if self.detection.is_fish_hooked_confirmed():
                 pag.click()
                 return
 
@@ -322,10 +409,10 @@ class Tackle:
         i = PULL_TIMEOUT
         while i > 0:
             i = utils.sleep_and_decrease(i, LOOP_DELAY)
-            if self.detection.is_fish_captured():
+            outcome = self._run_checks("pull")
+            if outcome == "keep":
                 return
-            if self.cfg.SCRIPT.SNAG_DETECTION and self.detection.is_line_snagged():
-                raise exceptions.LineSnaggedError
+            self._raise_for(outcome)
 
         if not self.detection.is_fish_hooked():
             raise exceptions.FishGotAwayError
@@ -445,15 +532,15 @@ class Tackle:
         """
         sleep(ANIMATION_DELAY)
         logger.info("Looking for favorite items")
-        favorite_item_positions = list(self.detection.get_favorite_item_positions())
+        favorite_items = self.detection.get_favorite_items(
+            FAVORITE_ITEM_OFFSET, check_wear=item == "lure"
+        ).tolist()
         if item == "lure":
-            random.shuffle(favorite_item_positions)
+            random.shuffle(favorite_items)
 
-        for favorite_item_position in favorite_item_positions:
-            x, y = utils.get_box_center(favorite_item_position)
-            if item == "lure" and pag.pixel(x - 70, y + 190) == (178, 59, 30):
-                continue
-            pag.click(x - 70, y + 190, clicks=2, interval=0.1)
+        if favorite_items:
+            x, y = favorite_items[0]
+            pag.click(x, y, clicks=2, interval=0.1)
             logger.info("New %s equiped successfully", item)
             return
 
@@ -25,6 +25,15 @@ _C.SCRIPT.SPOD_ROD_RECAST_DELAY = 1800
 # Use spin mode and -L to enable it.
 _C.SCRIPT.LURE_CHANGE_DELAY = 1800
 _C.SCRIPT.ALARM_SOUND = "./static/sound/guitar.wav"  # Path to alarm sound file
+# Number of background captures of the game window per second,
+# set it to 0 to capture the screen on every detection instead
+_C.SCRIPT.CAPTURE_FPS = 20
+_C.SCRIPT.CAPTURE_BUFFER_SIZE = 8  # Number of recent frames kept in memory
+# Template matching backend, "opencv" or "pyscreeze" (slower, for comparison)
+_C.SCRIPT.MATCHING_BACKEND = "opencv"
+# Size of the in-game HUD relative to the reference images, 1.0 for the default
+_C.SCRIPT.UI_SCALE = 1.0
+_C.SCRIPT.TEMPLATE_CACHE_SIZE = 64  # Memory budget of resized templates in MiB
 
 # ---------------------------------------------------------------------------- #
 #                                  Key Binding                                 #
@@ -297,9 +306,11 @@ _C.PROFILE.TELESCOPIC.MODE = "telescopic"
 _C.PROFILE.TELESCOPIC.CAST_POWER_LEVEL = 5.0
 # Delay after casting before lure sinks
 _C.PROFILE.TELESCOPIC.CAST_DELAY = 4.0
-# Sensitivity of float detection
-_C.PROFILE.TELESCOPIC.FLOAT_SENSITIVITY = 0.68
-_C.PROFILE.TELESCOPIC.CHECK_DELAY = 1.0  # Delay between fish bite checks
+# Motion of the float camera that counts as a bite, in deviations above its usual
+# level (waves, lighting), lower is more sensitive
+_C.PROFILE.TELESCOPIC.FLOAT_TRIGGER = 4.0
+# Unused, the float camera is checked continuously, see FLOAT_TRIGGER
+_C.PROFILE.TELESCOPIC.CHECK_DELAY = 1.0
 _C.PROFILE.TELESCOPIC.PULL_DELAY = 0.5  # Delay pulling a fish after it's hooked
 # Recast rod after timed out, designed for flowing water maps
 _C.PROFILE.TELESCOPIC.DRIFT_TIMEOUT = 16.0
@@ -319,9 +330,11 @@ _C.PROFILE.BOLOGNESE.MODE = "bolognese"
 _C.PROFILE.BOLOGNESE.CAST_POWER_LEVEL = 5.0
 # Delay after casting before lure sinks
 _C.PROFILE.BOLOGNESE.CAST_DELAY = 4.0
-# Sensitivity of float detection
-_C.PROFILE.BOLOGNESE.FLOAT_SENSITIVITY = 0.68
-_C.PROFILE.BOLOGNESE.CHECK_DELAY = 1.0  # Delay between fish bite checks
+# Motion of the float camera that counts as a bite, in deviations above its usual
+# level (waves, lighting), lower is more sensitive
+_C.PROFILE.BOLOGNESE.FLOAT_TRIGGER = 4.0
+# Delay between clip checks, the float camera is checked continuously
+_C.PROFILE.BOLOGNESE.CHECK_DELAY = 1.0
 _C.PROFILE.BOLOGNESE.PULL_DELAY = 0.5  # Delay pulling a fish after it's hooked
 # Recast rod after timed out, designed for flowing water maps
 _C.PROFILE.BOLOGNESE.DRIFT_TIMEOUT = 32.0
@@ -0,0 +1,111 @@
+"""Module for TemplateAtlas class.
+
+This module loads the templates of a language once, either by mapping the
+compiled pack, rebuilt first if the images have changed, or by decoding the
+reference images, so that template matching can reuse the arrays instead of
+reading PNG files every time. Instances sent to other processes map the pack
+checked by the parent process without checking it again.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import logging
+from pathlib import Path
+
+from rf4s.controller.pack import ensure_pack, get_pack_path, load_pack
+from rf4s.controller.template import Template, load_template
+from rf4s.controller.template_cache import template_cache
+
+logger = logging.getLogger("rich")
+
+
+class TemplateAtlas:
+    """Preloaded templates of a language directory.
+
+    Attributes:
+        image_dir (Path): Directory containing reference images.
+        templates (dict[str, Template]): Templates keyed by base name.
+    """
+
+    def __init__(self, image_dir: Path, check: bool = True):
+        """Load the templates from the pack, or from the images if it can't be built.
+
+        :param image_dir: Directory containing reference images.
+        :type image_dir: Path
+        :param check: Whether to rebuild the pack if it's out of date, defaults to
+            True.
+        :type check: bool, optional
+        """
+        self.image_dir = image_dir
+        self.templates = self._load_templates(check)
+
+    def _load_templates(self, check: bool) -> dict[str, Template]:
+        """Map the compiled pack, fall back to decoding every PNG file.
+
+        :param check: Whether to rebuild the pack first if it's missing or its
+            stamp doesn't match the images anymore.
+        :type check: bool
+        :return: Templates keyed by base name.
+        :rtype: dict[str, Template]
+        """
+        pack_path = get_pack_path(self.image_dir)
+        try:
+            if check:
+                ensure_pack(self.image_dir)
+            return load_pack(pack_path)
+        except (OSError, ValueError):
+            logger.warning("Invalid template pack '%s', ignoring it", pack_path)
+        return {
+            path.stem: load_template(path)
+            for path in sorted(self.image_dir.glob("*.png"))
+        }
+
+    def __getstate__(self) -> dict:
+        """Pickle the directory only, so other processes map the same pack."""
+        return {"image_dir": self.image_dir}
+
+    def __setstate__(self, state: dict) -> None:
+        """Map the pack checked by the parent process in the new process."""
+        self.__init__(state["image_dir"], check=False)
+
+    def __getitem__(self, name: str) -> Template:
+        """Get a template by its base name.
+
+        :param name: Base name of the image.
+        :type name: str
+        :raises FileNotFoundError: The image doesn't exist in the directory.
+        :return: The template.
+        :rtype: Template
+        """
+        try:
+            return self.templates[name]
+        except KeyError:
+            raise FileNotFoundError(self.image_dir / f"{name}.png") from None
+
+    def get_scaled(
+        self, name: str, scale: float, color_mode: str = "gray"
+    ) -> Template:
+        """Get a template resized to a HUD scale from the shared template cache.
+
+        :param name: Base name of the image.
+        :type name: str
+        :param scale: Size of the HUD relative to the reference images.
+        :type scale: float
+        :param color_mode: Pixels to keep, "bgr" or "gray", defaults to "gray".
+        :type color_mode: str, optional
+        :raises FileNotFoundError: The image doesn't exist in the directory.
+        :return: The resized template.
+        :rtype: Template
+        """
+        if scale == 1:
+            return self[name]
+        return template_cache.get(self[name], scale, color_mode)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.templates
+
+    def __iter__(self):
+        return iter(self.templates.values())
+
+    def __len__(self) -> int:
+        return len(self.templates)
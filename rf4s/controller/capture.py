@@ -0,0 +1,93 @@
+"""Module for FrameGrabber class.
+
+This module provides a background producer that captures a screen region at a
+fixed rate, so that detections can read the latest frame instead of paying for
+a screen capture on every call.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from rf4s.controller.frame import FrameSnapshot
+
+logger = logging.getLogger("rich")
+
+# A frame older than this many periods means the producer has stalled
+STALE_FRAME_PERIODS = 3
+
+
+class FrameGrabber:
+    """Background capture thread with a bounded ring buffer of frames.
+
+    Attributes:
+        region (tuple[int, int, int, int]): Screen region to capture.
+        period (float): Time between two captures in seconds.
+        frames (deque[FrameSnapshot]): Most recent frames, oldest first.
+    """
+
+    def __init__(
+        self, region: tuple[int, int, int, int], fps: float, buffer_size: int
+    ) -> None:
+        """Initialize the producer without starting it.
+
+        :param region: Screen region to capture (left, top, width, height).
+        :type region: tuple[int, int, int, int]
+        :param fps: Number of captures per second.
+        :type fps: float
+        :param buffer_size: Maximum number of frames kept in the buffer.
+        :type buffer_size: int
+        """
+        self.region = tuple(region)
+        self.period = 1 / fps
+        self.frames = deque(maxlen=buffer_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the capture thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start capturing in a daemon thread."""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop capturing and wait for the thread to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Capture the region periodically until stopped."""
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                self.frames.append(FrameSnapshot.grab(self.region))
+            except OSError:  # Screen grab fails when the desktop is locked, etc.
+                logger.debug("Failed to capture frame", exc_info=True)
+            elapsed = time.perf_counter() - start
+            self._stop_event.wait(max(0, self.period - elapsed))
+
+    def get_latest(self) -> FrameSnapshot | None:
+        """Get the most recent frame.
+
+        :return: The latest frame, None if there's no fresh frame available.
+        :rtype: FrameSnapshot | None
+        """
+        try:
+            frame = self.frames[-1]
+        except IndexError:
+            return None
+        if time.perf_counter() - frame.timestamp > self.period * STALE_FRAME_PERIODS:
+            return None
+        return frame
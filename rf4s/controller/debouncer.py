@@ -0,0 +1,78 @@
+"""Module for Debouncer class.
+
+A single positive read of a predicate might be a false positive, e.g., a fish
+nibbling the bait instead of being hooked. This module confirms a predicate when
+it stays positive long enough, without sleeping, so the control loop that polls
+it keeps running in the meantime.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import time
+from typing import Callable
+
+
+class Debouncer:
+    """Hysteresis on a predicate polled by a loop.
+
+    The predicate is confirmed when it's positive for min_count consecutive polls
+    or for min_duration seconds, whichever comes first. A negative poll starts
+    over.
+
+    Attributes:
+        predicate (Callable[[], bool]): Predicate to confirm.
+        min_count (int | None): Consecutive positive polls needed, None to ignore.
+        min_duration (float | None): Seconds the predicate must stay positive,
+            None to ignore.
+        count (int): Consecutive positive polls so far.
+        since (float | None): Time of the first positive poll in a row, None if
+            the last poll is negative.
+    """
+
+    def __init__(
+        self,
+        predicate: Callable[[], bool],
+        min_count: int | None = None,
+        min_duration: float | None = None,
+    ):
+        """Initialize the debouncer with the confirmation thresholds.
+
+        :param predicate: Predicate to confirm.
+        :type predicate: Callable[[], bool]
+        :param min_count: Consecutive positive polls needed, defaults to None.
+        :type min_count: int | None, optional
+        :param min_duration: Seconds the predicate must stay positive,
+            defaults to None.
+        :type min_duration: float | None, optional
+        :raises ValueError: Neither threshold is given.
+        """
+        if min_count is None and min_duration is None:
+            raise ValueError("Either min_count or min_duration is required")
+        self.predicate = predicate
+        self.min_count = min_count
+        self.min_duration = min_duration
+        self.count = 0
+        self.since = None
+
+    def reset(self) -> None:
+        """Forget the positive polls so far, e.g., when a new loop starts."""
+        self.count = 0
+        self.since = None
+
+    def poll(self) -> bool:
+        """Read the predicate once and check if it's confirmed.
+
+        :return: Whether the predicate has been positive long enough.
+        :rtype: bool
+        """
+        if not self.predicate():
+            self.reset()
+            return False
+
+        now = time.perf_counter()
+        if self.since is None:
+            self.since = now
+        self.count += 1
+        if self.min_count is not None and self.count >= self.min_count:
+            return True
+        return self.min_duration is not None and now - self.since >= self.min_duration
@@ -8,14 +8,32 @@ and pixel color analysis. It is used for automating tasks in Russian Fishing 4.
 
 # pylint: disable=missing-function-docstring
 
-import time
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Generator
+from typing import Callable, Iterable, Iterator, NamedTuple
 
+import numpy as np
 import pyautogui as pag
 from PIL import Image
 from pyscreeze import Box
 
+from rf4s.controller.capture import FrameGrabber
+from rf4s.controller.atlas import TemplateAtlas
+from rf4s.controller.debouncer import Debouncer
+from rf4s.controller.frame import FrameSnapshot
+from rf4s.controller import layout
+from rf4s.controller.hit_cache import HIT_CACHE_MARGIN, HitCache
+from rf4s.controller.line_meter import METER_TEMPLATES, GlyphReader, LineMeter
+from rf4s.controller.matcher import Match, suppress
+from rf4s.controller.probe import ProbeStrip, exceed_level, match_colors, measure_fill
+from rf4s.controller.region_memo import MEMO_TEMPLATES, RegionMemo, get_bounds
+from rf4s.controller.screen import MARKERS, ScreenClassifier
+from rf4s.controller.species import SpeciesIndex
+from rf4s.controller.stat_bar import STAT_BARS, StatBars
+from rf4s.controller.state_index import STATE_TEMPLATES, StateIndex
+from rf4s.controller.template import Template
+from rf4s.controller.template_cache import template_cache
 from rf4s.controller.window import Window
 
 CRITICAL_COLOR = (206, 56, 21)
@@ -26,56 +44,42 @@ MIN_GRAY_SCALE_LEVEL = 150
 YELLOW_FRICTION_BRAKE = (200, 214, 63)
 ORANGE_FRICTION_BRAKE = (229, 188, 0)
 RED_FRICTION_BRAKE = (206, 56, 21)
+TENSION_MIN_SATURATION = 96  # The tension bar is colored, its background is gray
 COLOR_TOLERANCE = 32
 CAMERA_OFFSET = 40
 SIDE_LENGTH = 160
 SIDE_LENGTH_HALF = 80
 ORANGE_REEL = (227, 149, 23)
+BROKEN_ITEM_COLOR = (178, 59, 30)  # Wear text of a broken item
+RAINBOW_LINE_LENGTH = 5  # Retrieval is finished at this length on the line meter
 
 ROOT = Path(__file__).resolve().parents[2]
 
-COORD_OFFSETS = {
-    "1600x900": {
-        "friction_brake_very_high": (502, 872),  # Left point only
-        "friction_brake_high": (459, 872),
-        "friction_brake_medium": (417, 872),
-        "friction_brake_low": (396, 872),
-        "fish_icon": (389, 844),
-        "clip_icon": (1042, 844),
-        "spool_icon": (1077, 844),  # x + 15, y + 15
-        "reel_burning_icon": (1112, 842),
-        "snag_icon": (1147, 829),  # x + 15, y
-        "float_camera": (720, 654),
-        "bait_icon": (35, 31),
-    },
-    "1920x1080": {
-        "friction_brake_very_high": (662, 1052),
-        "friction_brake_high": (619, 1052),
-        "friction_brake_medium": (577, 1052),
-        "friction_brake_low": (556, 1052),
-        "fish_icon": (549, 1024),
-        "clip_icon": (1202, 1024),
-        "spool_icon": (1237, 1024),
-        "reel_burning_icon": (1271, 1023),
-        "snag_icon": (1307, 1009),
-        "float_camera": (880, 834),
-        "bait_icon": (35, 31),
-    },
-    "2560x1440": {
-        "friction_brake_very_high": (982, 1412),
-        "friction_brake_high": (939, 1412),
-        "friction_brake_medium": (897, 1412),
-        "friction_brake_low": (876, 1412),
-        "fish_icon": (869, 1384),
-        "clip_icon": (1522, 1384),
-        "spool_icon": (1557, 1384),
-        "reel_burning_icon": (1593, 1383),
-        "snag_icon": (1627, 1369),
-        "float_camera": (1200, 1194),
-        "bait_icon": (35, 31),
-    },
+# Checks evaluated by reading pixels instead of matching a template
+PIXEL_PROBES = {
+    "fish_hooked": "is_fish_hooked",
+    "clip_open": "is_clip_open",
+    "line_at_end": "is_line_at_end",
+    "line_snagged": "is_line_snagged",
+    "reel_burning": "is_reel_burning",
+    "friction_brake_high": "is_friction_brake_high",
 }
 
+# Checks evaluated by a method instead of matching a template
+METHOD_CHECKS = {**PIXEL_PROBES, "line_short": "is_line_short"}
+
+# Species templates of the catch dialog
+FISH_SPECIES = (
+    "mackerel",
+    "saithe",
+    "herring",
+    "squid",
+    "scallop",
+    "mussel",
+    "perch",
+    "shorthorn_sculpin",
+)
+
 # ------------------------ Friction brake coordinates ------------------------ #
 # ----------------------------- 900p - 1080p - 2k ---------------------------- #
 # ------ left - red - yellow - center(left + 424) - yellow - red - right ----- #
@@ -86,6 +90,52 @@ COORD_OFFSETS = {
 # "2560x1440": {"x": (855, 960, 1066, 1279, 1491, 1598, 1702), "y": 1412},
 
 
+class Evaluation(NamedTuple):
+    """Result of a template or a pixel probe in a batch.
+
+    Attributes:
+        hit (bool): Whether the template is found or the probe is positive.
+        score (float): Matching score, 1 or 0 for pixel probes.
+        box (Box | None): Matched region, None if not found or it's a pixel probe.
+    """
+
+    hit: bool
+    score: float
+    box: Box | None
+
+
+class CatchRecord(NamedTuple):
+    """Content of the catch dialog.
+
+    Attributes:
+        species (str | None): Best matching species, None if it's not one of
+            FISH_SPECIES or it isn't classified.
+        marked (bool): Whether the fish is marked, False if it isn't searched.
+        scores (dict[str, float]): Matching scores of the species and "mark"
+            templates that are searched, 0 if not found.
+    """
+
+    species: str | None
+    marked: bool
+    scores: dict[str, float]
+
+
+class ProbePlan(NamedTuple):
+    """Checks of a stage compiled once, with everything they read.
+
+    Attributes:
+        stage (str): Name of the stage, e.g., "retrieve".
+        checks (dict[str, Callable[[], bool]]): Checks keyed by template or probe
+            name, templates and confidences are already resolved.
+        region (tuple[int, int, int, int] | None): Smallest absolute region
+            containing all templates and probes, None for the whole window.
+    """
+
+    stage: str
+    checks: dict[str, Callable[[], bool]]
+    region: tuple[int, int, int, int] | None
+
+
 class Detection:
     """A class that holds different aliases of locateOnScreen(image).
 
@@ -96,8 +146,39 @@ class Detection:
         cfg (CfgNode): Configuration node for the detection settings.
         window (Window): Game window controller instance.
         image_dir (Path): Directory containing reference images for detection.
-        coord_offsets (dict): Dictionary of coordinate offsets for different window sizes.
-        bait_icon_reference_img (Image): Reference image for bait icon detection.
+        scale (float): Size of the HUD relative to the reference images.
+        coord_offsets (dict): HUD coordinates relative to the window, derived from
+            the layout model.
+        template_regions (dict): Absolute search regions of templates, empty if the
+            window size is not supported.
+        atlas (TemplateAtlas): Preloaded templates of the selected language.
+        template_confidences (dict[str, float]): Configured confidences that
+            override the default ones of templates.
+        hit_cache (HitCache): Last matched boxes, searched before the regions.
+        screens (ScreenClassifier): Signatures of the screens seen so far.
+        states (StateIndex): Known states of the dialog regions, looked up before
+            matching the dialog templates.
+        region_memo (RegionMemo): Matching results of unchanged search regions.
+        hud_region (tuple[int, int, int, int] | None): Absolute region of the HUD
+            icons, None if the window size is not supported.
+        frame (FrameSnapshot | None): Snapshot shared by detections in the current
+            tick, None if every detection should read the screen directly.
+        grabber (FrameGrabber | None): Background capture producer, None if
+            detections should capture synchronously.
+        probes (ProbeStrip | None): Pixel probes of the HUD, None if the window
+            size is not supported.
+        probe_regions (dict[str, tuple[int, int, int, int]]): Absolute regions
+            read by the METHOD_CHECKS, empty if the window size is not supported.
+        line_meter (LineMeter): Reader of the rainbow line meter.
+        species_index (SpeciesIndex): Stacked species templates of the catch
+            dialog title.
+        stat_bars (StatBars): Located energy, hunger and comfort bars.
+        friction_brake_bar (tuple[int, int, int, int] | None): Absolute region of
+            the left half of the tension bar, None if the window size is not
+            supported.
+        friction_brake_threshold (float): Tension at the friction brake point of
+            the selected sensitivity.
+        hook_debouncer (Debouncer): Confirms that a fish stays hooked.
     """
 
     # pylint: disable=too-many-public-methods
@@ -113,58 +194,549 @@ class Detection:
         self.cfg = cfg
         self.window = window
         self.image_dir = ROOT / "static" / cfg.SCRIPT.LANGUAGE
-
+        self.scale = cfg.SCRIPT.UI_SCALE
+
+        self.atlas = TemplateAtlas(self.image_dir)
+        template_cache.set_budget(cfg.SCRIPT.TEMPLATE_CACHE_SIZE * 2**20)
+        self.template_confidences = {
+            "0m": cfg.SCRIPT.SPOOL_CONFIDENCE,
+            "5m": cfg.SCRIPT.SPOOL_CONFIDENCE,
+            "wheel": cfg.SCRIPT.SPOOL_CONFIDENCE,
+        }
+
+        self.template_regions = {}
+        self.hit_cache = HitCache()
+        self.screens = ScreenClassifier()
+        self.states = StateIndex()
+        self.region_memo = RegionMemo()
+        self.hud_region = None
+        self.probes = None
+        self.probe_regions = {}
+        self.line_meter = LineMeter(
+            GlyphReader(
+                {
+                    text: self._get_template(name).gray
+                    for name, text in METER_TEMPLATES.items()
+                    if name in self.atlas
+                }
+            ),
+            len(next(iter(METER_TEMPLATES.values()))),
+        )
+        species_templates = {}
+        for name in FISH_SPECIES:
+            if name in self.atlas:
+                template = self._get_template(name)
+                confidence = self._get_confidence(template)
+                species_templates[name] = (template.gray, confidence)
+        self.species_index = SpeciesIndex(species_templates, self.scale)
+        self.stat_bars = StatBars(self.scale)
+        self.friction_brake_bar = None
+        self.friction_brake_threshold = 1.0
         if window.supported:
             self._set_absolute_coords()
 
-        self.bait_icon_reference_img = Image.open(self.image_dir / "bait_icon.png")
+        self.frame = None
+        self.grabber = None
+        self._probe_hits = None  # (frame, hits) of the last evaluated frame
 
-    def _get_image_box(
-        self, image: str, confidence: float, multiple: bool = False
-    ) -> Box | Generator[Box, None, None] | None:
-        """A wrapper for locateOnScreen method and path resolving.
+        self.hook_debouncer = Debouncer(
+            self.is_fish_hooked,
+            min_duration=getattr(cfg.SELECTED, "HOOK_DELAY", 0),
+        )
+
+    def __getstate__(self) -> dict:
+        """Drop the capture state so the instance can be sent to another process."""
+        state = self.__dict__.copy()
+        state["frame"] = None
+        state["grabber"] = None
+        state["_probe_hits"] = None
+        return state
+
+    def start_capture(self, region: tuple[int, int, int, int] | None = None) -> None:
+        """Capture the game window in the background if it's enabled.
+
+        :param region: Absolute region to capture if only some detections are
+            used, defaults to the whole window.
+        :type region: tuple[int, int, int, int] | None, optional
+        """
+        if self.cfg.SCRIPT.CAPTURE_FPS <= 0 or self.grabber is not None:
+            return
+        self.grabber = FrameGrabber(
+            self.window.box if region is None else region,
+            self.cfg.SCRIPT.CAPTURE_FPS,
+            self.cfg.SCRIPT.CAPTURE_BUFFER_SIZE,
+        )
+        self.grabber.start()
+
+    def stop_capture(self) -> None:
+        """Stop the background capture and fall back to synchronous capturing."""
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+
+    def _get_frame(self) -> FrameSnapshot | None:
+        """Get the frame detections should read from.
+
+        :return: The pinned snapshot or the latest background frame, None if the
+            screen should be read directly.
+        :rtype: FrameSnapshot | None
+        """
+        if self.frame is not None:
+            return self.frame
+        if self.grabber is not None:
+            return self.grabber.get_latest()
+        return None
+
+    @contextmanager
+    def snapshot(
+        self, region: tuple[int, int, int, int] | None = None
+    ) -> Iterator[FrameSnapshot]:
+        """Capture the game window once and share it with all detections in the block.
+
+        The latest background frame is used if capturing in the background, and
+        nested calls reuse the outer snapshot so that a whole tick stays consistent.
+
+        :param region: Absolute region to capture if there's no background frame,
+            defaults to the whole window.
+        :type region: tuple[int, int, int, int] | None, optional
+        :yield: The snapshot used by detections inside the block.
+        :rtype: Iterator[FrameSnapshot]
+        """
+        if self.frame is not None:
+            yield self.frame
+            return
+
+        self.frame = self._get_frame() or FrameSnapshot.grab(region or self.window.box)
+        try:
+            yield self.frame
+        finally:
+            self.frame = None
+
+    def _get_template(self, name: str) -> Template:
+        """Get a template scaled to the HUD size.
+
+        :param name: Base name of the image.
+        :type name: str
+        :return: The scaled template.
+        :rtype: Template
+        """
+        return self.atlas.get_scaled(name, self.scale)
+
+    def _get_confidence(self, template: Template) -> float:
+        """Get the confidence of a template, configured ones take precedence.
+
+        :param template: Template to match.
+        :type template: Template
+        :return: Matching confidence.
+        :rtype: float
+        """
+        return self.template_confidences.get(template.name, template.confidence)
+
+    def evaluate(self, names: Iterable[str]) -> dict[str, Evaluation]:
+        """Evaluate templates and pixel probes against the same frame in one pass.
+
+        The window is captured once and converted to grayscale once for the whole
+        batch, every template is then matched in its search region of that frame.
+
+        :param names: Base names of templates or keys of METHOD_CHECKS.
+        :type names: Iterable[str]
+        :return: Results keyed by name.
+        :rtype: dict[str, Evaluation]
+        """
+        results = {}
+        with self.snapshot() as frame:
+            for name in names:
+                if name in METHOD_CHECKS:
+                    hit = bool(getattr(self, METHOD_CHECKS[name])())
+                    results[name] = Evaluation(hit, float(hit), None)
+                    continue
+                template = self._get_template(name)
+                match = self._find_template(
+                    template, self._get_confidence(template), frame
+                )
+                if match is None:
+                    results[name] = Evaluation(False, 0.0, None)
+                else:
+                    results[name] = Evaluation(True, match.score, match.box)
+        return results
+
+    def compile_plan(self, stage: str, names: Iterable[str]) -> ProbePlan:
+        """Resolve the checks of a stage and the region they read, once.
+
+        :param stage: Name of the stage, e.g., "retrieve".
+        :type stage: str
+        :param names: Base names of templates or keys of METHOD_CHECKS.
+        :type names: Iterable[str]
+        :return: The compiled plan.
+        :rtype: ProbePlan
+        """
+        checks, regions = {}, []
+        for name in names:
+            if name in METHOD_CHECKS:
+                checks[name] = getattr(self, METHOD_CHECKS[name])
+                regions.append(self.probe_regions.get(name))
+                continue
+            template = self._get_template(name)
+            confidence = self._get_confidence(template)
+            checks[name] = partial(self._is_template_found, template, confidence)
+            region = self.template_regions.get(name)
+            if region is not None:  # Leave room for hits around the region
+                region = (
+                    region[0] - HIT_CACHE_MARGIN,
+                    region[1] - HIT_CACHE_MARGIN,
+                    region[2] + HIT_CACHE_MARGIN * 2,
+                    region[3] + HIT_CACHE_MARGIN * 2,
+                )
+            regions.append(region)
+
+        region = None
+        if regions and None not in regions:
+            left, top, width, height = get_bounds(*regions)
+            window_left, window_top, window_width, window_height = self.window.box
+            right = min(left + width, window_left + window_width)
+            bottom = min(top + height, window_top + window_height)
+            left, top = max(left, window_left), max(top, window_top)
+            region = (left, top, right - left, bottom - top)
+        return ProbePlan(stage, checks, region)
+
+    def _is_template_found(self, template: Template, confidence: float) -> bool:
+        """Check if a resolved template is found in the current frame.
+
+        :param template: Template to match.
+        :type template: Template
+        :param confidence: Minimum score of a match.
+        :type confidence: float
+        :return: Whether the template is found.
+        :rtype: bool
+        """
+        return self._find_template(template, confidence, self._get_frame()) is not None
+
+    def _find_template(
+        self, template: Template, confidence: float, frame: FrameSnapshot | None
+    ) -> Match | None:
+        """Match a resolved template with the backend of SCRIPT.MATCHING_BACKEND.
+
+        :param template: Template to match.
+        :type template: Template
+        :param confidence: Minimum score of a match.
+        :type confidence: float
+        :param frame: Frame to search in, None to capture the screen.
+        :type frame: FrameSnapshot | None
+        :return: The best match in absolute screen coordinates, None if not found.
+            PyScreeze doesn't report scores, its matches are scored at confidence.
+        :rtype: Match | None
+        """
+        if self.cfg.SCRIPT.MATCHING_BACKEND == "opencv":
+            return self._match_template(template, confidence, frame)
+
+        region = self.template_regions.get(template.name)
+        if frame is not None:
+            box = frame.locate(template.gray, confidence, region=region)
+        else:
+            box = pag.locateOnScreen(
+                template.gray, confidence=confidence, region=region
+            )
+        return None if box is None else Match(box, confidence)
+
+    def get_image_match(
+        self, image: str, confidence: float | None = None, multiple: bool = False
+    ) -> Match | list[Match] | None:
+        """Match a template with OpenCV, the score is returned with the box.
 
         :param image: Base name of the image.
         :type image: str
-        :param confidence: Matching confidence for locateOnScreen.
+        :param confidence: Minimum score of a match, defaults to the template's
+            default confidence.
+        :type confidence: float | None, optional
+        :param multiple: Whether to locate all matches, defaults to False.
+        :type multiple: bool, optional
+        :return: Match(es) in absolute screen coordinates, None if not found.
+        :rtype: Match | list[Match] | None
+        """
+        template = self._get_template(image)
+        if confidence is None:
+            confidence = self._get_confidence(template)
+        frame = self._get_frame()
+        if not multiple:
+            return self._match_template(template, confidence, frame)
+        region = self.template_regions.get(image)
+        if frame is None:  # Capture the search region only
+            return FrameSnapshot.grab(region or self.window.box).match(
+                template, confidence, multiple, region=region, pyramid=region is None
+            )
+        matches = frame.match(
+            template, confidence, multiple, region=region, pyramid=region is None
+        )
+        if matches:
+            self.screens.validate(self.window.get_current_box())
+            best = max(matches, key=lambda match: match.score)
+            self._learn_screen(template.name, best.box, frame)
+        return matches
+
+    def _match_template(
+        self, template: Template, confidence: float, frame: FrameSnapshot | None
+    ) -> Match | None:
+        """Match a template around its last hit first, then in its search region.
+
+        Searching the whole window is done coarse-to-fine. Dialogs are looked up in
+        the state index first and only matched if their region is in a new state.
+
+        :param template: Template to match.
+        :type template: Template
+        :param confidence: Minimum score of a match.
+        :type confidence: float
+        :param frame: Frame to search in, None to capture only the searched region.
+        :type frame: FrameSnapshot | None
+        :return: The best match in absolute screen coordinates, None if not found.
+        :rtype: Match | None
+        """
+        window_box = self.window.get_current_box()
+        self.hit_cache.validate(window_box)
+        self.screens.validate(window_box)
+        self.states.validate(window_box)
+        self.region_memo.validate(window_box)
+        if frame is not None and template.name in STATE_TEMPLATES:
+            lookup = self.states.lookup(template.name, frame)
+            if lookup.found:
+                return lookup.match
+            match = self._search_template(template, confidence, frame)
+            self.states.record(template.name, frame, lookup, match)
+            return match
+        return self._search_template(template, confidence, frame)
+
+    def _search_template(
+        self, template: Template, confidence: float, frame: FrameSnapshot | None
+    ) -> Match | None:
+        """Search a template around its last hit, then in its search region.
+
+        :param template: Template to match.
+        :type template: Template
+        :param confidence: Minimum score of a match.
         :type confidence: float
+        :param frame: Frame to search in, None to capture only the searched region.
+        :type frame: FrameSnapshot | None
+        :return: The best match in absolute screen coordinates, None if not found.
+        :rtype: Match | None
+        """
+        region = self.template_regions.get(template.name)
+        hit_region = self.hit_cache.get_region(template.name)
+        key = None
+        if frame is not None and region is not None and template.name in MEMO_TEMPLATES:
+            # The result only depends on the pixels of the searched regions
+            key = self.region_memo.get_key(
+                template.name, confidence, get_bounds(region, hit_region), frame
+            )
+            found, match = self.region_memo.get(key)
+            if found:
+                return match
+
+        match = None
+        searches = [(hit_region, False), (region or self.window.box, region is None)]
+        for region, pyramid in searches:
+            if region is None:
+                continue
+            match = (frame or FrameSnapshot.grab(region)).match(
+                template, confidence, region=region, pyramid=pyramid
+            )
+            if match is not None:
+                self.hit_cache.update(template.name, match.box)
+                if frame is not None:
+                    self._learn_screen(template.name, match.box, frame)
+                break
+        if key is not None:
+            self.region_memo.put(key, match)
+        return match
+
+    def _learn_screen(self, name: str, box: Box, frame: FrameSnapshot) -> None:
+        """Record the signature of the screen a matched template belongs to.
+
+        :param name: Base name of the matched template.
+        :type name: str
+        :param box: Matched region in absolute screen coordinates.
+        :type box: Box
+        :param frame: Frame the template is matched in.
+        :type frame: FrameSnapshot
+        """
+        screen = MARKERS.get(name)
+        if screen is None:
+            return
+        # HUD hints come and go, the icons around them stay while fishing
+        region = self.hud_region if screen == "fishing" else box
+        if region is not None:
+            self.screens.learn(screen, region, frame)
+
+    def classify_screen(self) -> frozenset[str]:
+        """Identify the current screen by the signatures of the screens seen so far.
+
+        :return: Names of the matching screens, empty if the screen is unknown.
+        :rtype: frozenset[str]
+        """
+        self.screens.validate(self.window.get_current_box())
+        with self.snapshot() as frame:
+            return self.screens.classify(frame)
+
+    def _get_image_box(
+        self, image: str, confidence: float | None = None, multiple: bool = False
+    ) -> Box | Iterator[Box] | None:
+        """A wrapper for locateOnScreen method, template and search region resolving.
+
+        The matching backend is selected by SCRIPT.MATCHING_BACKEND.
+
+        :param image: Base name of the image.
+        :type image: str
+        :param confidence: Matching confidence for locateOnScreen, defaults to the
+            template's default confidence.
+        :type confidence: float | None, optional
         :param multiple: Whether to locate all matching images, defaults to False.
         :type multiple: bool, optional
         :return: Image box, None if not found.
         :rtype: Box | None
         """
-        image_path = str(self.image_dir / f"{image}.png")
-        if multiple:
-            return pag.locateAllOnScreen(image_path, confidence=confidence)
-        return pag.locateOnScreen(image_path, confidence=confidence)
+        if self.cfg.SCRIPT.MATCHING_BACKEND == "opencv" and multiple:
+            return (m.box for m in self.get_image_match(image, confidence, multiple))
+
+        template = self._get_template(image)
+        if confidence is None:
+            confidence = self._get_confidence(template)
+        frame = self._get_frame()
+        if not multiple:
+            match = self._find_template(template, confidence, frame)
+            return match if match is None else match.box
+
+        region = self.template_regions.get(image)
+        if frame is not None:
+            return frame.locate(template.gray, confidence, multiple, region=region)
+        return pag.locateAllOnScreen(
+            template.gray, confidence=confidence, region=region
+        )
 
     def _set_absolute_coords(self) -> None:
-        """Add offsets to the base coordinates to get absolute ones."""
-        window_size = f"{self.window.box[2]}x{self.window.box[3]}"
-        self.coord_offsets = COORD_OFFSETS[window_size]
+        """Derive absolute coordinates from the HUD layout model."""
+        window_size = tuple(self.window.box[2:])
+        self.coord_offsets = layout.get_hud_coords(window_size, self.scale)
 
         for key in self.coord_offsets:
             setattr(self, f"{key}_coord", self._get_absolute_coord(key))
 
-        self.bait_icon_coord = self._get_absolute_coord("bait_icon") + [44, 52]
+        for template in self.atlas:
+            if template.region is not None:
+                self.template_regions[template.name] = self._get_absolute_region(
+                    template.region.resolve(window_size, self.scale)
+                )
+
+        self.bait_icon_coord = self._get_absolute_region(
+            layout.HUD_RECTS["bait_icon"].resolve(window_size, self.scale)
+        )
+        self.hud_region = self._get_absolute_region(
+            layout.HUD_RECTS["hud"].resolve(window_size, self.scale)
+        )
         friction_brake_key = f"friction_brake_{self.cfg.FRICTION_BRAKE.SENSITIVITY}"
         self.friction_brake_coord = self._get_absolute_coord(friction_brake_key)
+        self.friction_brake_bar = self._get_absolute_region(
+            layout.HUD_RECTS["friction_brake_bar"].resolve(window_size, self.scale)
+        )
+        left, _, width, _ = self.friction_brake_bar
+        center = left + width
+        self.friction_brake_threshold = (center - self.friction_brake_coord[0]) / width
 
         bases = self._get_absolute_coord("float_camera")
         if self.cfg.SELECTED.MODE in ("telescopic", "bolognese"):
+            offset = round(CAMERA_OFFSET * self.scale)
+            side_length = round(SIDE_LENGTH * self.scale)
+            side_length_half = round(SIDE_LENGTH_HALF * self.scale)
             match self.cfg.SELECTED.CAMERA_SHAPE:
                 case "tall":
-                    bases[0] += CAMERA_OFFSET
-                    width, height = SIDE_LENGTH_HALF, SIDE_LENGTH
+                    bases[0] += offset
+                    width, height = side_length_half, side_length
                 case "wide":
-                    bases[1] += CAMERA_OFFSET
-                    width, height = SIDE_LENGTH, SIDE_LENGTH_HALF
+                    bases[1] += offset
+                    width, height = side_length, side_length_half
                 case "square":
-                    width, height = SIDE_LENGTH, SIDE_LENGTH
+                    width, height = side_length, side_length
                 case _:
                     raise ValueError(self.cfg.SELECTED.CAMERA_SHAPE)
             self.float_camera_rect = (*bases, width, height)  # (left, top, w, h)
 
+        self.probes = ProbeStrip(
+            {
+                "fish_hooked": exceed_level(self.fish_icon_coord, MIN_GRAY_SCALE_LEVEL),
+                "clip_open": exceed_level(
+                    self.clip_icon_coord, MIN_GRAY_SCALE_LEVEL, inverted=True
+                ),
+                "line_snagged": match_colors(self.snag_icon_coord, CRITICAL_COLOR),
+                "line_at_end": match_colors(
+                    self.spool_icon_coord, WARNING_COLOR, CRITICAL_COLOR
+                ),
+                "reel_burning": match_colors(self.reel_burning_icon_coord, ORANGE_REEL),
+                "friction_brake_high": match_colors(
+                    self.friction_brake_coord,
+                    RED_FRICTION_BRAKE,
+                    tolerance=COLOR_TOLERANCE,
+                ),
+            }
+        )
+
+        self.probe_regions = dict.fromkeys(self.probes.names, self.probes.region)
+        meter_regions = [
+            self.template_regions[name]
+            for name in METER_TEMPLATES
+            if name in self.template_regions
+        ]
+        if meter_regions:
+            self.probe_regions["line_short"] = get_bounds(*meter_regions)
+
+    def _get_probe_hits(self) -> dict[str, bool]:
+        """Evaluate all pixel probes at once, results are reused within a frame.
+
+        :return: Results keyed by probe name.
+        :rtype: dict[str, bool]
+        """
+        frame = self._get_frame()
+        if frame is None:  # Capture the strip only
+            return self.probes.evaluate()
+        if self._probe_hits is None or self._probe_hits[0] is not frame:
+            self._probe_hits = (frame, self.probes.evaluate(frame))
+        return self._probe_hits[1]
+
+    def _get_absolute_region(
+        self, region: tuple[int, int, int, int]
+    ) -> tuple[int, int, int, int]:
+        """Convert a region relative to the window to an absolute one.
+
+        :param region: Region relative to the window (left, top, width, height).
+        :type region: tuple[int, int, int, int]
+        :return: Absolute region.
+        :rtype: tuple[int, int, int, int]
+        """
+        left, top, width, height = region
+        return self.window.box[0] + left, self.window.box[1] + top, width, height
+
+    def _get_pixel(self, coord: list[int]) -> tuple[int, int, int]:
+        """A wrapper for pag.pixel that reads from the current frame if there's one.
+
+        :param coord: Absolute coordinate (x, y).
+        :type coord: list[int]
+        :return: RGB color of the pixel.
+        :rtype: tuple[int, int, int]
+        """
+        frame = self._get_frame()
+        if frame is not None:
+            return frame.pixel(*coord)
+        return pag.pixel(*coord)
+
+    def _get_screenshot(self, region: tuple[int, int, int, int]) -> Image.Image:
+        """A wrapper for pag.screenshot that crops the current frame if there's one.
+
+        :param region: Region to capture (left, top, width, height).
+        :type region: tuple[int, int, int, int]
+        :return: Image of the region.
+        :rtype: Image.Image
+        """
+        frame = self._get_frame()
+        if frame is not None:
+            return Image.fromarray(frame.crop(region)[:, :, ::-1])
+        return pag.screenshot(region=region)
+
     def _get_absolute_coord(self, offset_key: str) -> list[int]:
         """Calculate absolute coordinate based on given key.
 
@@ -180,161 +752,305 @@ class Detection:
 
     # ----------------------------- Unmarked release ----------------------------- #
     def is_fish_marked(self):
-        return self._get_image_box("mark", 0.7)
+        return self._get_image_box("mark")
+
+    def parse_catch(self) -> CatchRecord | None:
+        """Parse the catch dialog, all templates are matched in the same frame.
 
-    def is_fish_species_matched(self, species: str):
-        return self._get_image_box(species, 0.9)
+        The species is only classified if it decides whether to keep the fish,
+        i.e., the blacklist isn't empty, or unmarked fish are released unless
+        they're whitelisted. The mark isn't searched for blacklisted fish.
+
+        :return: Content of the dialog, None if no fish is captured.
+        :rtype: CatchRecord | None
+        """
+        keepnet = self.cfg.KEEPNET
+        with self.snapshot() as frame:
+            keep = self.evaluate(["keep"])["keep"]
+            if not keep.hit:
+                return None
+            species, scores = None, {}
+            if keepnet.BLACKLIST:
+                species, scores = self._classify_species(frame, keep.box)
+                if species in keepnet.BLACKLIST:
+                    return CatchRecord(species, False, scores)
+
+            marked = self.evaluate(["mark"])["mark"]
+            if (
+                not marked.hit
+                and not scores
+                and self.cfg.ARGS.MARKED
+                and keepnet.RELEASE_WHITELIST
+            ):
+                species, scores = self._classify_species(frame, keep.box)
+        return CatchRecord(species, marked.hit, {**scores, "mark": marked.score})
+
+    def _classify_species(
+        self, frame: FrameSnapshot, keep: Box
+    ) -> tuple[str | None, dict[str, float]]:
+        """Classify the species in the catch dialog.
+
+        The species is classified by the stacked templates at the title, which is
+        located from the keep button. Until a species has been found at the title,
+        a negative result falls back to searching the species templates in the
+        window, which also measures where the title is.
+
+        :param frame: Frame showing the catch dialog.
+        :type frame: FrameSnapshot
+        :param keep: Box of the keep button in absolute screen coordinates.
+        :type keep: Box
+        :return: The best matching species, None if none is found, and the scores
+            of all species.
+        :rtype: tuple[str | None, dict[str, float]]
+        """
+        self.species_index.validate(self.window.get_current_box())
+        if not self.species_index.confirmed:
+            self.species_index.seed(frame, keep)
+        result = self.species_index.classify(frame)
+        if result.species is not None or self.species_index.confirmed:
+            return result.species, result.scores
+
+        results = self.evaluate(self.species_index.names)
+        scores = {name: result.score for name, result in results.items()}
+        found = [name for name in results if results[name].hit]
+        best = max(found, key=scores.get, default=None)
+        if best is not None:
+            self.species_index.learn(best, results[best].box, keep)
+        return best, scores
 
     # -------------------------------- Fish status ------------------------------- #
     def is_fish_hooked(self):
         if self.window.supported:
             return self.is_fish_hooked_pixel()
-        return self._get_image_box("fish_icon", 0.9)
+        return self._get_image_box("fish_icon")
 
     def is_fish_hooked_pixel(self) -> bool:
-        return all(c > MIN_GRAY_SCALE_LEVEL for c in pag.pixel(*self.fish_icon_coord))
+        return self._get_probe_hits()["fish_hooked"]
 
-    def is_fish_hooked_twice(self) -> bool:
-        if not self.is_fish_hooked():
-            return False
+    def is_fish_hooked_confirmed(self) -> bool:
+        """Check if a fish stays hooked for HOOK_DELAY seconds, without blocking.
 
-        # check if the fish got away after a short delay
-        time.sleep(self.cfg.SELECTED.HOOK_DELAY)
-        if self.is_fish_hooked():
-            return True
-        return False
+        The first positive read only starts the confirmation, the loop polling this
+        keeps running until a later read confirms it or the fish gets away.
+
+        :return: Whether the fish has been hooked long enough.
+        :rtype: bool
+        """
+        return self.hook_debouncer.poll()
 
     def is_fish_captured(self):
-        return self._get_image_box("keep", 0.9)
+        return self._get_image_box("keep")
 
     def is_clip_open(self) -> bool:
-        return not all(
-            c > MIN_GRAY_SCALE_LEVEL for c in pag.pixel(*self.clip_icon_coord)
-        )
+        return self._get_probe_hits()["clip_open"]
 
     # ---------------------------- Retrieval detection --------------------------- #
     def is_retrieval_finished(self):
         ready = self.is_tackle_ready()
         if self.cfg.ARGS.RAINBOW_LINE:
-            return ready or self._is_rainbow_line_0or5m()
+            return ready or self.is_line_short()
         return ready or self._is_spool_full()
 
+    def get_retrieval_finished_templates(self) -> tuple[str, ...]:
+        """Get the checks that indicate the end of retrieval, for batches.
+
+        :return: Base names of templates or keys of METHOD_CHECKS, any of them being
+            positive is enough.
+        :rtype: tuple[str, ...]
+        """
+        if self.cfg.ARGS.RAINBOW_LINE:
+            return ("ready", "line_short")
+        return ("ready", "wheel")
+
     def _is_rainbow_line_0or5m(self):
-        return self._get_image_box(
-            "5m", self.cfg.SCRIPT.SPOOL_CONFIDENCE
-        ) or self._get_image_box("0m", self.cfg.SCRIPT.SPOOL_CONFIDENCE)
+        return self._get_image_box("5m") or self._get_image_box("0m")
+
+    def _get_line_meter_box(self) -> Box | None:
+        """Get the box of the rainbow line meter, located by its templates.
+
+        :return: The last matched box of a meter template, None if not located yet.
+        :rtype: Box | None
+        """
+        self.hit_cache.validate(self.window.get_current_box())
+        for name in METER_TEMPLATES:
+            box = self.hit_cache.boxes.get(name)
+            if box is not None:
+                return box
+        return None
+
+    def get_line_length(self, learn: bool = False) -> int | None:
+        """Read the remaining length on the rainbow line meter.
+
+        :param learn: Whether the line is being retrieved, so that unknown digits
+            can be learned from the countdown, defaults to False.
+        :type learn: bool, optional
+        :return: Remaining length in meters, None if the meter hasn't been located
+            yet, not all digits are known, or it can't be read.
+        :rtype: int | None
+        """
+        box = self._get_line_meter_box()
+        if box is None:
+            return None
+        frame = self._get_frame() or FrameSnapshot.grab(tuple(box))
+        return self.line_meter.read(frame.crop(tuple(box)), learn)
+
+    def learn_line_meter(self) -> bool:
+        """Sample the countdown of the rainbow line meter to learn its digits.
+
+        :return: Whether the meter has been located and some digits are unknown.
+        :rtype: bool
+        """
+        if self.line_meter.ready or self._get_line_meter_box() is None:
+            return False
+        self.get_line_length(learn=True)
+        return True
+
+    def is_line_short(self) -> bool:
+        """Check if the rainbow line is retrieved to RAINBOW_LINE_LENGTH or less.
+
+        The meter is matched against its templates until it has been located and
+        the glyphs of all digits are known, then it's read directly.
+
+        :return: Whether the retrieval is finished.
+        :rtype: bool
+        """
+        if self._get_line_meter_box() is None or not self.line_meter.ready:
+            return bool(self._is_rainbow_line_0or5m())
+        length = self.get_line_length()
+        return length is not None and length <= RAINBOW_LINE_LENGTH
 
     def _is_spool_full(self):
-        return self._get_image_box("wheel", self.cfg.SCRIPT.SPOOL_CONFIDENCE)
+        return self._get_image_box("wheel")
 
     def is_line_snagged(self) -> bool:
-        return pag.pixel(*self.snag_icon_coord) == CRITICAL_COLOR
+        return self._get_probe_hits()["line_snagged"]
 
     def is_line_at_end(self) -> bool:
-        return pag.pixel(*self.spool_icon_coord) in (WARNING_COLOR, CRITICAL_COLOR)
+        return self._get_probe_hits()["line_at_end"]
 
     # ------------------------------ Text detection ------------------------------ #
     def is_tackle_ready(self):
-        return self._get_image_box("ready", 0.6)
+        return self._get_image_box("ready")
 
     def is_tackle_broken(self):
-        return self._get_image_box("broke", 0.8)
+        return self._get_image_box("broke")
 
     def is_lure_broken(self):
-        return self._get_image_box("lure_is_broken", 0.8)
+        return self._get_image_box("lure_is_broken")
 
     def is_moving_in_bottom_layer(self):
-        return self._get_image_box("movement", 0.7)
+        return self._get_image_box("movement")
 
     # ------------------------------ Hint detection ------------------------------ #
     def is_disconnected(self):
-        return self._get_image_box("disconnected", 0.9)
+        return self._get_image_box("disconnected")
 
     def is_ticket_expired(self):
-        return self._get_image_box("ticket", 0.9)
+        return self._get_image_box("ticket")
 
     # ------------------------------- Item crafting ------------------------------ #
     def is_operation_failed(self):
-        return self._get_image_box("warning", 0.8)
+        return self._get_image_box("warning")
 
     def is_operation_success(self):
-        return self._get_image_box("ok_black", 0.8) or self._get_image_box(
-            "ok_white", 0.8
-        )
+        return self._get_image_box("ok_black") or self._get_image_box("ok_white")
 
     def is_material_complete(self):
-        return not self._get_image_box("material_slot", 0.9)
+        return not self._get_image_box("material_slot")
 
     # ---------------------- Quiting game from control panel --------------------- #
     def get_quit_position(self):
-        return self._get_image_box("quit", 0.8)
+        return self._get_image_box("quit")
 
     def get_yes_position(self):
-        return self._get_image_box("yes", 0.8)
+        return self._get_image_box("yes")
 
     def get_make_button_position(self):
-        return self._get_image_box("make", 0.9)
+        return self._get_image_box("make")
 
     # ------------------------ Quiting game from main menu ----------------------- #
     def get_exit_icon_position(self):
-        return self._get_image_box("exit", 0.8)
+        return self._get_image_box("exit")
 
     def get_confirm_button_position(self):
-        return self._get_image_box("confirm", 0.8)
+        return self._get_image_box("confirm")
 
     # ------------------------------- Player stats ------------------------------- #
-    def _get_energy_icon_position(self):
-        box = self._get_image_box("energy", 0.8)
-        return box if box is None else pag.center(box)
+    def get_food_position(self, food: str):
+        return self._get_image_box(food)
 
-    def _get_food_icon_position(self):
-        box = self._get_image_box("food", 0.8)
-        return box if box is None else pag.center(box)
+    def get_stat_levels(self) -> dict[str, float | None]:
+        """Read the energy, hunger and comfort bars from one capture.
 
-    def _get_comfort_icon_position(self):
-        box = self._get_image_box("comfort", 0.8)
-        return box if box is None else pag.center(box)
+        The icons are only searched until they're found, afterwards the bars are
+        read directly.
 
-    def get_food_position(self, food: str):
-        return self._get_image_box(food, 0.8)
+        :return: Fill levels in [0, 1] keyed by stat, None if the icon is not found.
+        :rtype: dict[str, float | None]
+        """
+        self.stat_bars.validate(self.window.get_current_box())
+        for name, (icon, _) in STAT_BARS.items():
+            if name in self.stat_bars.anchors:
+                continue
+            box = self._get_image_box(icon)
+            if box is not None:
+                center = (box.left + box.width // 2, box.top + box.height // 2)
+                self.stat_bars.anchors[name] = center
+
+        region = self.stat_bars.get_region()
+        if region is None:
+            return dict.fromkeys(STAT_BARS)
+        return self.stat_bars.read(self._get_frame() or FrameSnapshot.grab(region))
 
     def is_energy_high(self) -> bool:
-        pos = self._get_energy_icon_position()
-        if not pos:
-            return False
-        x, y = int(pos.x), int(pos.y)
         # default threshold: 0.74,  well done FishSoft
-        last_point = int(19 + 152 * self.cfg.STAT.ENERGY_THRESHOLD) - 1
-        return pag.pixel(x + 19, y) == pag.pixel(x + last_point, y)
+        level = self.get_stat_levels()["energy"]
+        return level is not None and level >= self.cfg.STAT.ENERGY_THRESHOLD
 
     def is_hunger_low(self) -> bool:
-        pos = self._get_food_icon_position()
-        if not pos:
-            return False
-        x, y = int(pos.x), int(pos.y)
-        last_point = int(18 + 152 * self.cfg.STAT.HUNGER_THRESHOLD) - 1
-        return not pag.pixel(x + 18, y) == pag.pixel(x + last_point, y)
+        level = self.get_stat_levels()["hunger"]
+        return level is not None and level < self.cfg.STAT.HUNGER_THRESHOLD
 
     def is_comfort_low(self) -> bool:
-        pos = self._get_comfort_icon_position()
-        if not pos:
-            return False
-        x, y = int(pos.x), int(pos.y)
-        last_point = int(18 + 152 * self.cfg.STAT.COMFORT_THRESHOLD) - 1
-        return not pag.pixel(x + 18, y) == pag.pixel(x + last_point, y)
+        level = self.get_stat_levels()["comfort"]
+        return level is not None and level < self.cfg.STAT.COMFORT_THRESHOLD
 
     # ----------------------------- Item replacement ----------------------------- #
     def get_scrollbar_position(self):
-        return self._get_image_box("scrollbar", 0.97)
+        return self._get_image_box("scrollbar")
 
     def get_100wear_position(self):
-        return self._get_image_box("100wear", 0.98)
-
-    def get_favorite_item_positions(self):
-        return self._get_image_box("favorite", 0.95, multiple=True)
+        return self._get_image_box("100wear")
+
+    def get_favorite_items(
+        self, offset: tuple[int, int], check_wear: bool = False
+    ) -> np.ndarray:
+        """Locate the usable favorite items in the selection menu with one capture.
+
+        :param offset: Offset from the center of a favorite star to its item.
+        :type offset: tuple[int, int]
+        :param check_wear: Whether to skip broken items, defaults to False.
+        :type check_wear: bool, optional
+        :return: Coordinates (x, y) of the items ranked by matching score,
+            shape (number of items, 2).
+        :rtype: np.ndarray
+        """
+        with self.snapshot() as frame:
+            matches = suppress(self.get_image_match("favorite", multiple=True))
+            if not matches:
+                return np.empty((0, 2), dtype=int)
+            boxes = np.array([match.box for match in matches])
+            coords = boxes[:, :2] + boxes[:, 2:] // 2 + offset
+            usable = frame.contains(coords)
+            if check_wear:
+                broken = np.zeros(len(coords), dtype=bool)
+                colors = frame.pixels(coords[usable])
+                broken[usable] = (colors == BROKEN_ITEM_COLOR).all(axis=1)
+                usable &= ~broken
+            return coords[usable]
 
     def is_pva_chosen(self):
-        return self._get_image_box("pva_icon", 0.6) is None
+        return self._get_image_box("pva_icon") is None
 
     def is_bait_chosen(self):
         if self.cfg.SELECTED.MODE in ("pirk", "elevator"):
@@ -344,43 +1060,56 @@ class Detection:
         if self.cfg.SELECTED.MODE in ("telescopic", "bolognese"):
             return (
                 pag.locate(
-                    pag.screenshot(region=self.bait_icon_coord),
-                    self.bait_icon_reference_img,
-                    confidence=0.6,
+                    self._get_screenshot(self.bait_icon_coord),
+                    self._get_template("bait_icon").gray,
+                    confidence=self._get_template("bait_icon").confidence,
                 )
                 is None
             )
-        return self._get_image_box("bait_icon", 0.6) is None
+        return self._get_image_box("bait_icon") is None
 
     def is_groundbait_chosen(self):
-        return self._get_image_box("groundbait_icon", 0.6) is None
+        return self._get_image_box("groundbait_icon") is None
 
     def get_groundbait_position(self):
-        return self._get_image_box("classic_feed_mix", 0.98)
+        return self._get_image_box("classic_feed_mix")
 
     def get_dry_mix_position(self):
-        return self._get_image_box("dry_feed_mix", 0.98)
+        return self._get_image_box("dry_feed_mix")
 
     # ------------------------------ Friction brake ------------------------------ #
     def is_friction_brake_high(self) -> bool:
-        return pag.pixelMatchesColor(
-            *self.friction_brake_coord, RED_FRICTION_BRAKE, COLOR_TOLERANCE
-        )
+        return self._get_probe_hits()["friction_brake_high"]
+
+    def get_friction_brake_tension(self) -> float | None:
+        """Read how far the tension bar is filled from one strip capture.
+
+        :return: Tension in [0, 1], None if the window size is not supported.
+        :rtype: float | None
+        """
+        if self.friction_brake_bar is None:
+            return None
+        frame = self._get_frame() or FrameSnapshot.grab(self.friction_brake_bar)
+        pixels = frame.crop(self.friction_brake_bar)
+        if len(pixels) == 0:
+            return None
+        # The bar is filled from the center, i.e., the right end of the left half
+        return measure_fill(pixels[0, ::-1, ::-1], TENSION_MIN_SATURATION)
 
     def is_reel_burning(self) -> bool:
-        return pag.pixel(*self.reel_burning_icon_coord) == ORANGE_REEL
-
-    def is_float_state_changed(self, reference_img):
-        current_img = pag.screenshot(region=self.float_camera_rect)
-        return not pag.locate(
-            current_img,
-            reference_img,
-            grayscale=True,
-            confidence=self.cfg.SELECTED.FLOAT_SENSITIVITY,
-        )
+        return self._get_probe_hits()["reel_burning"]
+
+    def get_float_camera(self) -> tuple[np.ndarray, float]:
+        """Get the pixels of the float camera from the latest frame.
+
+        :return: BGR pixels of the camera and their capture time.
+        :rtype: tuple[np.ndarray, float]
+        """
+        frame = self._get_frame() or FrameSnapshot.grab(self.float_camera_rect)
+        return frame.crop(self.float_camera_rect), frame.timestamp
 
     def get_ticket_position(self, duration: int):
-        return self._get_image_box(f"ticket_{duration}", 0.95)
+        return self._get_image_box(f"ticket_{duration}")
 
     def is_harvest_success(self):
-        return self._get_image_box("harvest_confirm", 0.8)
+        return self._get_image_box("harvest_confirm")
@@ -0,0 +1,259 @@
+"""Module for FrameSnapshot class.
+
+This module provides an in-memory capture of the game window, so that several
+detections can read from the same frame instead of grabbing the screen again.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import time
+from typing import Generator
+
+import cv2
+import numpy as np
+import pyautogui as pag
+from pyscreeze import Box
+
+from rf4s.controller import matcher
+from rf4s.controller.matcher import Match
+from rf4s.controller.template import Template
+
+
+class FrameSnapshot:
+    """A single capture of a screen region stored as a BGR numpy array.
+
+    Coordinates accepted and returned by the methods are absolute screen
+    coordinates, just like the ones used by pag.pixel and pag.locateOnScreen.
+
+    Attributes:
+        image (np.ndarray): Captured pixels in BGR order, shape (height, width, 3).
+        left (int): Absolute x coordinate of the top-left pixel.
+        top (int): Absolute y coordinate of the top-left pixel.
+        timestamp (float): Time when the frame was captured.
+    """
+
+    def __init__(self, image: np.ndarray, left: int, top: int, timestamp: float):
+        """Initialize the snapshot with captured pixels and their screen origin.
+
+        :param image: Captured pixels in BGR order.
+        :type image: np.ndarray
+        :param left: Absolute x coordinate of the top-left pixel.
+        :type left: int
+        :param top: Absolute y coordinate of the top-left pixel.
+        :type top: int
+        :param timestamp: Time when the frame was captured.
+        :type timestamp: float
+        """
+        self.image = image
+        self.left = left
+        self.top = top
+        self.timestamp = timestamp
+        self._gray = None
+        self._small_gray = None
+
+    @classmethod
+    def grab(cls, region: tuple[int, int, int, int]) -> "FrameSnapshot":
+        """Capture the given screen region.
+
+        :param region: Region to capture (left, top, width, height).
+        :type region: tuple[int, int, int, int]
+        :return: A new snapshot of the region.
+        :rtype: FrameSnapshot
+        """
+        timestamp = time.perf_counter()
+        screenshot = pag.screenshot(region=tuple(region))
+        image = np.ascontiguousarray(np.asarray(screenshot.convert("RGB"))[:, :, ::-1])
+        return cls(image, region[0], region[1], timestamp)
+
+    @property
+    def width(self) -> int:
+        """Width of the captured region."""
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        """Height of the captured region."""
+        return self.image.shape[0]
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Grayscale pixels, converted on first access and reused afterwards."""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def small_gray(self) -> np.ndarray:
+        """Grayscale pixels downscaled for coarse-to-fine matching, also cached."""
+        if self._small_gray is None:
+            self._small_gray = matcher.downscale(self.gray)
+        return self._small_gray
+
+    def pixel(self, x: int, y: int) -> tuple[int, int, int]:
+        """Get the RGB color of an absolute screen coordinate.
+
+        :param x: Absolute x coordinate.
+        :type x: int
+        :param y: Absolute y coordinate.
+        :type y: int
+        :return: RGB color, same format as pag.pixel.
+        :rtype: tuple[int, int, int]
+        """
+        b, g, r = self.image[y - self.top, x - self.left]
+        return int(r), int(g), int(b)
+
+    def pixels(self, coords: np.ndarray) -> np.ndarray:
+        """Get the RGB colors of absolute screen coordinates in one read.
+
+        :param coords: Absolute coordinates (x, y), shape (number of pixels, 2).
+        :type coords: np.ndarray
+        :return: RGB colors, shape (number of pixels, 3).
+        :rtype: np.ndarray
+        """
+        coords = np.asarray(coords)
+        return self.image[coords[:, 1] - self.top, coords[:, 0] - self.left, ::-1]
+
+    def contains(self, coords: np.ndarray) -> np.ndarray:
+        """Check which absolute screen coordinates are inside the frame.
+
+        :param coords: Absolute coordinates (x, y), shape (number of pixels, 2).
+        :type coords: np.ndarray
+        :return: Boolean mask, shape (number of pixels,).
+        :rtype: np.ndarray
+        """
+        coords = np.asarray(coords)
+        xs, ys = coords[:, 0] - self.left, coords[:, 1] - self.top
+        return (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+
+    def crop(self, region: tuple[int, int, int, int]) -> np.ndarray:
+        """Get a view of an absolute screen region.
+
+        :param region: Region to crop (left, top, width, height).
+        :type region: tuple[int, int, int, int]
+        :return: BGR pixels of the part of the region inside the frame, not copied.
+        :rtype: np.ndarray
+        """
+        left, top, width, height = self.clip(region)
+        left, top = left - self.left, top - self.top
+        return self.image[top : top + height, left : left + width]
+
+    def clip(self, region: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+        """Get the part of an absolute screen region inside the frame.
+
+        :param region: Region to clip (left, top, width, height).
+        :type region: tuple[int, int, int, int]
+        :return: Clipped region, its size is 0 if it's outside the frame.
+        :rtype: tuple[int, int, int, int]
+        """
+        left = min(max(region[0], self.left), self.left + self.width)
+        top = min(max(region[1], self.top), self.top + self.height)
+        right = min(max(region[0] + region[2], left), self.left + self.width)
+        bottom = min(max(region[1] + region[3], top), self.top + self.height)
+        return left, top, right - left, bottom - top
+
+    def locate(
+        self,
+        image,
+        confidence: float,
+        multiple: bool = False,
+        region: tuple[int, int, int, int] | None = None,
+        **kwargs,
+    ) -> Box | Generator[Box, None, None] | None:
+        """Locate an image inside the frame, a drop-in for pag.locateOnScreen.
+
+        :param image: Needle image, a path, PIL image or BGR numpy array.
+        :type image: str | Image | np.ndarray
+        :param confidence: Matching confidence.
+        :type confidence: float
+        :param multiple: Whether to locate all matching images, defaults to False.
+        :type multiple: bool, optional
+        :param region: Absolute region to search in, defaults to the whole frame.
+        :type region: tuple[int, int, int, int] | None, optional
+        :return: Image box(es) in absolute screen coordinates, None if not found.
+        :rtype: Box | Generator[Box, None, None] | None
+        """
+        if region is not None:
+            kwargs["region"] = (
+                region[0] - self.left,
+                region[1] - self.top,
+                region[2],
+                region[3],
+            )
+        if multiple:
+            boxes = pag.locateAll(image, self.image, confidence=confidence, **kwargs)
+            return (self._to_screen(box) for box in boxes or ())
+        box = pag.locate(image, self.image, confidence=confidence, **kwargs)
+        return box if box is None else self._to_screen(box)
+
+    def match(
+        self,
+        template: Template,
+        confidence: float,
+        multiple: bool = False,
+        region: tuple[int, int, int, int] | None = None,
+        pyramid: bool = False,
+    ) -> Match | list[Match] | None:
+        """Match a template with OpenCV directly, scores are returned with the boxes.
+
+        :param template: Template to match.
+        :type template: Template
+        :param confidence: Minimum score of a match.
+        :type confidence: float
+        :param multiple: Whether to locate all matches, defaults to False.
+        :type multiple: bool, optional
+        :param region: Absolute region to search in, defaults to the whole frame.
+        :type region: tuple[int, int, int, int] | None, optional
+        :param pyramid: Whether to search coarse-to-fine, defaults to False.
+        :type pyramid: bool, optional
+        :return: Match(es) in absolute screen coordinates, None if not found.
+        :rtype: Match | list[Match] | None
+        """
+        image = self.gray
+        left, top = self.left, self.top
+        if region is not None and tuple(region) == (left, top, self.width, self.height):
+            region = None  # Reuse the cached pyramid of the whole frame
+        if region is not None:
+            region = self.clip(region)
+            image = image[
+                region[1] - top : region[1] - top + region[3],
+                region[0] - left : region[0] - left + region[2],
+            ]
+            left, top = region[0], region[1]
+        small_image = None
+        if pyramid and region is None:
+            small_image = self.small_gray
+        elif pyramid:
+            small_image = matcher.downscale(image)
+
+        if multiple:
+            return [
+                Match(self._to_screen(match.box, left, top), match.score)
+                for match in matcher.locate_all(
+                    template, image, confidence, small_image
+                )
+            ]
+        match = matcher.locate(template, image, confidence, small_image)
+        if match is None:
+            return None
+        return Match(self._to_screen(match.box, left, top), match.score)
+
+    def _to_screen(
+        self, box: Box, left: int | None = None, top: int | None = None
+    ) -> Box:
+        """Translate a box from frame coordinates to screen coordinates.
+
+        :param box: Box relative to the frame or a region of it.
+        :type box: Box
+        :param left: Absolute x coordinate of the origin, defaults to the frame's.
+        :type left: int | None, optional
+        :param top: Absolute y coordinate of the origin, defaults to the frame's.
+        :type top: int | None, optional
+        :return: Box in absolute screen coordinates.
+        :rtype: Box
+        """
+        return Box(
+            int(box.left) + (self.left if left is None else left),
+            int(box.top) + (self.top if top is None else top),
+            int(box.width),
+            int(box.height),
+        )
@@ -0,0 +1,66 @@
+"""Module for HitCache class.
+
+Most UI elements appear at the same spot every time they're shown, so the last
+matched box of a template is a good guess for the next search. This module keeps
+those boxes and turns them into small search regions.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from pyscreeze import Box
+
+from rf4s.controller.window_state import WindowState
+
+# Extra pixels around the last box to tolerate small shifts of the element
+HIT_CACHE_MARGIN = 8
+
+
+class HitCache(WindowState):
+    """Last matched boxes of templates in a game window.
+
+    Attributes:
+        margin (int): Extra pixels around the last box.
+        boxes (dict[str, Box]): Last matched boxes keyed by template name.
+    """
+
+    def __init__(self, margin: int = HIT_CACHE_MARGIN):
+        """Initialize an empty cache.
+
+        :param margin: Extra pixels around the last box, defaults to HIT_CACHE_MARGIN.
+        :type margin: int, optional
+        """
+        super().__init__()
+        self.margin = margin
+        self.boxes = {}
+
+    def clear(self) -> None:
+        """Drop all boxes, e.g., when the window has been moved or resized."""
+        self.boxes.clear()
+
+    def get_region(self, name: str) -> tuple[int, int, int, int] | None:
+        """Get the neighborhood of the last box of a template.
+
+        :param name: Base name of the template.
+        :type name: str
+        :return: Search region clipped to the window, None if there's no hit yet.
+        :rtype: tuple[int, int, int, int] | None
+        """
+        box = self.boxes.get(name)
+        if box is None:
+            return None
+        window_left, window_top, window_width, window_height = self.window_box
+        left = max(box.left - self.margin, window_left)
+        top = max(box.top - self.margin, window_top)
+        right = min(box.left + box.width + self.margin, window_left + window_width)
+        bottom = min(box.top + box.height + self.margin, window_top + window_height)
+        return left, top, right - left, bottom - top
+
+    def update(self, name: str, box: Box) -> None:
+        """Remember the matched box of a template.
+
+        :param name: Base name of the template.
+        :type name: str
+        :param box: Matched box in absolute screen coordinates.
+        :type box: Box
+        """
+        self.boxes[name] = box
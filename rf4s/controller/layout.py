@@ -0,0 +1,143 @@
+"""Module for the HUD layout model.
+
+The HUD of the game isn't stretched with the window, every element keeps its pixel
+size and stays at a fixed distance from an edge or the center of the window. This
+module describes the elements as offsets from such anchors, measured in a
+1920x1080 window, so that their coordinates can be derived for any window size.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from typing import NamedTuple
+
+# Smallest window that fits the HUD elements and the search regions
+MIN_WINDOW_SIZE = (1280, 720)
+
+
+class Anchor(NamedTuple):
+    """A point anchored to the window.
+
+    Attributes:
+        fraction_x (float): Horizontal anchor as a fraction of the window width.
+        fraction_y (float): Vertical anchor as a fraction of the window height.
+        offset_x (int): Horizontal offset from the anchor in reference pixels.
+        offset_y (int): Vertical offset from the anchor in reference pixels.
+    """
+
+    fraction_x: float
+    fraction_y: float
+    offset_x: int
+    offset_y: int
+
+    def resolve(self, size: tuple[int, int], scale: float = 1.0) -> tuple[int, int]:
+        """Get the coordinate relative to the window.
+
+        :param size: Window size (width, height).
+        :type size: tuple[int, int]
+        :param scale: Size of the HUD relative to the reference, defaults to 1.0.
+        :type scale: float, optional
+        :return: Coordinate (x, y) relative to the top-left corner of the window.
+        :rtype: tuple[int, int]
+        """
+        return (
+            round(self.fraction_x * size[0] + self.offset_x * scale),
+            round(self.fraction_y * size[1] + self.offset_y * scale),
+        )
+
+
+class Rect(NamedTuple):
+    """A rectangle whose corners are anchored to the window separately.
+
+    Attributes:
+        top_left (Anchor): Top-left corner, inclusive.
+        bottom_right (Anchor): Bottom-right corner, exclusive.
+    """
+
+    top_left: Anchor
+    bottom_right: Anchor
+
+    def resolve(
+        self, size: tuple[int, int], scale: float = 1.0
+    ) -> tuple[int, int, int, int]:
+        """Get the region relative to the window, clipped to the window.
+
+        :param size: Window size (width, height).
+        :type size: tuple[int, int]
+        :param scale: Size of the HUD relative to the reference, defaults to 1.0.
+        :type scale: float, optional
+        :return: Region (left, top, width, height) relative to the window.
+        :rtype: tuple[int, int, int, int]
+        """
+        left, top = self.top_left.resolve(size, scale)
+        right, bottom = self.bottom_right.resolve(size, scale)
+        left, top = max(left, 0), max(top, 0)
+        right, bottom = min(right, size[0]), min(bottom, size[1])
+        return left, top, max(right - left, 0), max(bottom - top, 0)
+
+
+def top_left(x: int, y: int) -> Anchor:
+    """Anchor a point to the top-left corner of the window."""
+    return Anchor(0, 0, x, y)
+
+
+def bottom_center(x: int, y: int) -> Anchor:
+    """Anchor a point to the center of the bottom edge of the window."""
+    return Anchor(0.5, 1, x, y)
+
+
+# Pixels checked by the pixel probes, the friction brake points are the left ones
+HUD_POINTS = {
+    "friction_brake_very_high": bottom_center(-298, -28),
+    "friction_brake_high": bottom_center(-341, -28),
+    "friction_brake_medium": bottom_center(-383, -28),
+    "friction_brake_low": bottom_center(-404, -28),
+    "fish_icon": bottom_center(-411, -56),
+    "clip_icon": bottom_center(242, -56),
+    "spool_icon": bottom_center(277, -56),  # x + 15, y + 15
+    "reel_burning_icon": bottom_center(311, -57),
+    "snag_icon": bottom_center(347, -71),  # x + 15, y
+    "float_camera": bottom_center(-80, -246),
+}
+
+# Hand-measured points of the supported sizes that the model is a pixel or two off
+HUD_POINT_OVERRIDES = {
+    (1600, 900): {"reel_burning_icon": (1112, 842)},
+    (2560, 1440): {"reel_burning_icon": (1593, 1383)},
+}
+
+HUD_RECTS = {
+    "bait_icon": Rect(top_left(35, 31), top_left(79, 83)),
+    "hud": Rect(bottom_center(-411, -71), bottom_center(348, -27)),  # Icons row
+    # Left half of the tension bar, it's filled from the center to both sides
+    "friction_brake_bar": Rect(bottom_center(-425, -28), bottom_center(-1, -27)),
+}
+
+
+def get_hud_coords(size: tuple[int, int], scale: float = 1.0) -> dict:
+    """Get the coordinates of all HUD points for a window size.
+
+    Hand-measured points override the model in the supported sizes at the
+    reference scale.
+
+    :param size: Window size (width, height).
+    :type size: tuple[int, int]
+    :param scale: Size of the HUD relative to the reference, defaults to 1.0.
+    :type scale: float, optional
+    :return: Coordinates (x, y) relative to the window, keyed by point name.
+    :rtype: dict[str, tuple[int, int]]
+    """
+    coords = {name: anchor.resolve(size, scale) for name, anchor in HUD_POINTS.items()}
+    if scale == 1:
+        coords.update(HUD_POINT_OVERRIDES.get(tuple(size), {}))
+    return coords
+
+
+def is_size_supported(size: tuple[int, int]) -> bool:
+    """Check if the HUD model fits in a window.
+
+    :param size: Window size (width, height).
+    :type size: tuple[int, int]
+    :return: Whether the window is large enough.
+    :rtype: bool
+    """
+    return size[0] >= MIN_WINDOW_SIZE[0] and size[1] >= MIN_WINDOW_SIZE[1]
@@ -0,0 +1,347 @@
+"""Module for GlyphReader and LineMeter classes.
+
+The line meter of the rainbow line shows the remaining length as zero-padded
+digits with a fixed pitch. Instead of matching one template per reading, this
+module cuts the meter into cells and classifies every cell against a set of
+glyphs in one vectorized pass. The glyphs of "0" and "5" are cut from the meter
+templates, the other digits are learned while the line is retrieved: the last
+digit counts down, so the unknown glyphs shown between two known digits are the
+digits in between. Once all ten digits are known, the meter can be read from one
+crop. Successive readings also give the retrieval speed and the time until the
+line reaches a length.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Text shown by the line meter templates, every sample teaches its glyphs
+METER_TEMPLATES = {"0m": "000", "5m": "005"}
+DIGITS = "0123456789"
+
+GLYPH_SIZE = (6, 10)  # Width and height glyphs are normalized to
+GLYPH_LEVEL = 128  # Brighter pixels belong to a glyph
+GLYPH_MAX_DISTANCE = 0.05  # Maximum ratio of pixels that differ from the glyph
+GLYPH_MIN_MARGIN = 0.05  # Minimum distance gap between the best two glyphs
+GLYPH_MIN_VOTES = 2  # Countdowns that must agree before a glyph is learned
+METER_READINGS = 8  # Readings kept to estimate the retrieval speed
+
+
+def split_cells(image: np.ndarray, count: int) -> list[np.ndarray]:
+    """Cut a fixed-pitch text image into one cell per character.
+
+    :param image: Grayscale image of the text.
+    :type image: np.ndarray
+    :param count: Number of characters.
+    :type count: int
+    :return: Cells from left to right.
+    :rtype: list[np.ndarray]
+    """
+    width = image.shape[1] // count
+    return [image[:, i * width : (i + 1) * width] for i in range(count)]
+
+
+def normalize(cell: np.ndarray) -> np.ndarray | None:
+    """Binarize a cell and fit the rows of its glyph into GLYPH_SIZE.
+
+    :param cell: Grayscale cell.
+    :type cell: np.ndarray
+    :return: Glyph pixels, shape (height, width), None if the cell is empty.
+    :rtype: np.ndarray | None
+    """
+    mask = cell > GLYPH_LEVEL
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0 or mask.shape[1] == 0:
+        return None
+    mask = mask[rows[0] : rows[-1] + 1].astype(np.uint8)
+    return cv2.resize(mask, GLYPH_SIZE, interpolation=cv2.INTER_NEAREST).astype(bool)
+
+
+def get_distance(glyph: np.ndarray, other: np.ndarray) -> float:
+    """Get the ratio of pixels that differ between two glyphs."""
+    return float((glyph != other).mean())
+
+
+class GlyphReader:
+    """Classifier of fixed-pitch characters.
+
+    Attributes:
+        labels (list[str]): Character of every glyph.
+        glyphs (np.ndarray): Normalized glyphs, shape (n, height, width).
+    """
+
+    def __init__(self, samples: dict[str, np.ndarray]):
+        """Cut the glyphs out of images whose text is known.
+
+        :param samples: Grayscale images keyed by the text they show.
+        :type samples: dict[str, np.ndarray]
+        """
+        self.labels = []
+        self.glyphs = np.zeros((0, GLYPH_SIZE[1], GLYPH_SIZE[0]), dtype=bool)
+        for text, image in samples.items():
+            glyphs = self.cut(image, len(text))
+            for char, glyph in zip(text, [] if glyphs is None else glyphs):
+                if char not in self.labels:
+                    self.add(char, glyph)
+
+    def add(self, char: str, glyph: np.ndarray) -> None:
+        """Learn the glyph of a character.
+
+        :param char: Character shown by the glyph.
+        :type char: str
+        :param glyph: Normalized glyph.
+        :type glyph: np.ndarray
+        """
+        self.labels.append(char)
+        self.glyphs = np.concatenate([self.glyphs, glyph[None]])
+
+    def knows(self, chars: str) -> bool:
+        """Check if glyphs of all characters have been learned.
+
+        A missing glyph would be read as the closest known one, so texts can only
+        be trusted if every character they might contain is known.
+
+        :param chars: Characters to check.
+        :type chars: str
+        :return: Whether all characters are known.
+        :rtype: bool
+        """
+        return all(char in self.labels for char in chars)
+
+    def cut(self, image: np.ndarray, count: int) -> np.ndarray | None:
+        """Cut a fixed-pitch text into normalized glyphs.
+
+        :param image: Grayscale image of the text.
+        :type image: np.ndarray
+        :param count: Number of characters.
+        :type count: int
+        :return: Glyphs from left to right, shape (count, height, width), None if
+            a cell is empty.
+        :rtype: np.ndarray | None
+        """
+        if image.shape[1] < count:
+            return None
+        cells = [normalize(cell) for cell in split_cells(image, count)]
+        if any(cell is None for cell in cells):
+            return None
+        return np.stack(cells)
+
+    def get_distances(self, glyphs: np.ndarray) -> np.ndarray:
+        """Compare glyphs with all known glyphs.
+
+        :param glyphs: Normalized glyphs, shape (n, height, width).
+        :type glyphs: np.ndarray
+        :return: Ratio of differing pixels, shape (n, number of known glyphs).
+        :rtype: np.ndarray
+        """
+        return (glyphs[:, None] != self.glyphs[None]).mean(axis=(2, 3))
+
+    def classify(self, glyphs: np.ndarray) -> str | None:
+        """Classify normalized glyphs.
+
+        :param glyphs: Normalized glyphs, shape (n, height, width).
+        :type glyphs: np.ndarray
+        :return: The text, None if a glyph doesn't match any known one or it's
+            ambiguous between two of them.
+        :rtype: str | None
+        """
+        if len(self.labels) == 0:
+            return None
+        distances = self.get_distances(glyphs)
+        order = distances.argsort(axis=1)
+        best = order[:, 0]
+        rows = np.arange(len(glyphs))
+        if (distances[rows, best] > GLYPH_MAX_DISTANCE).any():
+            return None
+        if len(self.labels) > 1:
+            margins = distances[rows, order[:, 1]] - distances[rows, best]
+            if (margins < GLYPH_MIN_MARGIN).any():
+                return None
+        return "".join(self.labels[i] for i in best)
+
+    def read(self, image: np.ndarray, count: int) -> str | None:
+        """Read a fixed-pitch text.
+
+        :param image: Grayscale image of the text.
+        :type image: np.ndarray
+        :param count: Number of characters.
+        :type count: int
+        :return: The text, None if a character doesn't match any glyph or it's
+            ambiguous between two glyphs.
+        :rtype: str | None
+        """
+        glyphs = self.cut(image, count)
+        return None if glyphs is None else self.classify(glyphs)
+
+
+class LineMeter:
+    """Reader of the rainbow line meter with a history of its readings.
+
+    Attributes:
+        reader (GlyphReader): Classifier of the meter digits.
+        digits (int): Number of digits shown by the meter.
+        readings (deque[tuple[float, int]]): Recent (time, length) readings.
+        last_digit (str | None): Last known digit of the countdown, None if the
+            countdown has been interrupted.
+        pending (list[np.ndarray]): Unknown last-digit glyphs shown since then.
+        candidates (list[tuple[str, np.ndarray, int]]): Labelled glyphs waiting
+            for GLYPH_MIN_VOTES countdowns, with their votes.
+    """
+
+    def __init__(self, reader: GlyphReader, digits: int):
+        """Initialize the meter without readings.
+
+        :param reader: Classifier of the meter digits.
+        :type reader: GlyphReader
+        :param digits: Number of digits shown by the meter.
+        :type digits: int
+        """
+        self.reader = reader
+        self.digits = digits
+        self.readings = deque(maxlen=METER_READINGS)
+        self.last_digit = None
+        self.pending = []
+        self.candidates = []
+
+    def reset(self) -> None:
+        """Forget the readings and the countdown, e.g., when a retrieval starts."""
+        self.readings.clear()
+        self.last_digit = None
+        self.pending.clear()
+
+    @property
+    def ready(self) -> bool:
+        """Whether all digits are known, so that no digit can be misread."""
+        return self.reader.knows(DIGITS)
+
+    def read(self, image: np.ndarray, learn: bool = False) -> int | None:
+        """Read the remaining line length from a crop of the meter.
+
+        :param image: BGR or grayscale pixels of the meter.
+        :type image: np.ndarray
+        :param learn: Whether the line is being retrieved, so that the last digit
+            counts down and unknown digits can be learned, defaults to False.
+        :type learn: bool, optional
+        :return: Remaining length in meters, None if the meter can't be read or
+            not all digits are known yet.
+        :rtype: int | None
+        """
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        glyphs = self.reader.cut(image, self.digits)
+        if glyphs is None:
+            return None
+        if learn and not self.ready:
+            self._learn(glyphs[-1])
+        if not self.ready:
+            return None
+        text = self.reader.classify(glyphs)
+        if text is None or not text.isdigit():
+            return None
+        length = int(text)
+        self.readings.append((time.perf_counter(), length))
+        return length
+
+    def _learn(self, glyph: np.ndarray) -> None:
+        """Follow the countdown of the last digit and label the unknown glyphs.
+
+        :param glyph: Normalized glyph of the last digit.
+        :type glyph: np.ndarray
+        """
+        digit = self.reader.classify(glyph[None])
+        if digit is not None:
+            if self.last_digit is not None and digit != self.last_digit:
+                self._label(self.last_digit, digit)
+                self.pending.clear()
+            elif self.pending:  # A digit came back, it's not a countdown
+                self.pending.clear()
+            self.last_digit = digit
+            return
+
+        distances = self.reader.get_distances(glyph[None])[0]
+        if (distances <= GLYPH_MAX_DISTANCE).any():  # Ambiguous
+            self.reset()
+            return
+        if self.pending and get_distance(glyph, self.pending[-1]) <= (
+            GLYPH_MAX_DISTANCE
+        ):
+            return  # Same digit as the last frame
+        if len(self.pending) >= len(DIGITS) or any(
+            get_distance(glyph, other) <= GLYPH_MAX_DISTANCE for other in self.pending
+        ):
+            self.reset()
+            return
+        self.pending.append(glyph)
+
+    def _label(self, start: str, end: str) -> None:
+        """Label the pending glyphs shown while counting down from start to end.
+
+        The labels are only trusted if the number of glyphs matches, i.e., no
+        digit has been skipped between two reads.
+
+        :param start: Known digit before the pending glyphs.
+        :type start: str
+        :param end: Known digit after the pending glyphs.
+        :type end: str
+        """
+        if (int(start) - int(end)) % 10 - 1 != len(self.pending):
+            return
+        for i, glyph in enumerate(self.pending, 1):
+            self._vote(str((int(start) - i) % 10), glyph)
+
+    def _vote(self, digit: str, glyph: np.ndarray) -> None:
+        """Count a labelled glyph, learn it once enough countdowns agree.
+
+        :param digit: Label of the glyph.
+        :type digit: str
+        :param glyph: Normalized glyph.
+        :type glyph: np.ndarray
+        """
+        for i, (label, other, votes) in enumerate(self.candidates):
+            if get_distance(glyph, other) > GLYPH_MAX_DISTANCE:
+                continue
+            if label != digit:  # Conflicting countdowns, trust neither
+                del self.candidates[i]
+                return
+            if votes + 1 >= GLYPH_MIN_VOTES and digit not in self.reader.labels:
+                self.reader.add(digit, other)
+                del self.candidates[i]
+            else:
+                self.candidates[i] = (label, other, votes + 1)
+            return
+        if GLYPH_MIN_VOTES <= 1:
+            self.reader.add(digit, glyph)
+        else:
+            self.candidates.append((digit, glyph, 1))
+
+    def get_speed(self) -> float | None:
+        """Estimate the retrieval speed from the recent readings.
+
+        :return: Meters retrieved per second, None if the length hasn't changed.
+        :rtype: float | None
+        """
+        if len(self.readings) < 2:
+            return None
+        times, lengths = np.array(self.readings, dtype=float).T
+        if np.ptp(lengths) == 0 or np.ptp(times) == 0:
+            return None
+        return float(-np.polyfit(times, lengths, 1)[0])
+
+    def get_eta(self, length: int) -> float | None:
+        """Predict the time until the line is retrieved to a length.
+
+        :param length: Target length in meters.
+        :type length: int
+        :return: Seconds from now, None if the speed is unknown or not positive.
+        :rtype: float | None
+        """
+        speed = self.get_speed()
+        if speed is None or speed <= 0:
+            return None
+        last_time, last_length = self.readings[-1]
+        eta = (last_length - length) / speed - (time.perf_counter() - last_time)
+        return max(eta, 0.0)
@@ -0,0 +1,325 @@
+"""Module for OpenCV template matching.
+
+This module calls cv2.matchTemplate directly on the preconverted template arrays,
+skipping the image loading and conversions done by pyscreeze on every call, and
+returns the matching scores along with the boxes.
+
+Full-window searches can run coarse-to-fine: the template is matched in a
+downscaled image first, then verified at full resolution only around the
+candidates, so the confidence keeps the same meaning.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+from pyscreeze import Box
+
+from rf4s.controller.template import Template
+
+# Template matching methods, the masked one only compares the opaque pixels. It
+# uses the correlation coefficient too, so that the confidences mean the same and
+# the brightness of the background doesn't raise the scores.
+METHODS = {
+    "ccoeff": cv2.TM_CCOEFF_NORMED,
+    "sqdiff": cv2.TM_SQDIFF_NORMED,
+    "masked": cv2.TM_CCOEFF_NORMED,
+}
+
+# Upper bound of matches returned by locate_all
+MAX_MATCHES = 1000
+# Matches overlapping a better one by more than this IoU are dropped by suppress
+NMS_OVERLAP = 0.3
+
+# Coarse-to-fine matching, one level of cv2.pyrDown halves both dimensions
+PYRAMID_SCALE = 2
+# Downscaled scores are lower than the full-resolution ones, especially for thin
+# text at odd coordinates, keep more candidates to avoid missing them
+PYRAMID_CONFIDENCE_MARGIN = 0.35
+# Minimum side of a downscaled template, thinner text like the line meter digits
+# is blurred away and missed at odd coordinates on flat backgrounds
+PYRAMID_MIN_SIZE = 8
+PYRAMID_BORDER = 1  # Downscaled border pixels blurred with the outside of a template
+# Fall back to a full-resolution search if verifying the candidates costs more
+PYRAMID_MAX_CANDIDATES = 256
+PYRAMID_MAX_AREA_RATIO = 0.25
+
+_downscaled_templates = {}  # Keyed by template hash
+
+
+class Match(NamedTuple):
+    """A matched template.
+
+    Attributes:
+        box (Box): Matched region (left, top, width, height).
+        score (float): Similarity between 0 and 1, higher is better.
+    """
+
+    box: Box
+    score: float
+
+
+def get_scores(template: Template, image: np.ndarray) -> np.ndarray | None:
+    """Slide a template over a grayscale image and calculate the similarities.
+
+    Scores of all methods are converted to the range [0, 1], higher is better,
+    so they can be compared with the same confidence.
+
+    :param template: Template to match.
+    :type template: Template
+    :param image: Grayscale image to search in.
+    :type image: np.ndarray
+    :return: Score of every top-left position, None if the template is larger
+        than the image.
+    :rtype: np.ndarray | None
+    """
+    height, width = template.gray.shape
+    if image.shape[0] < height or image.shape[1] < width:
+        return None
+
+    method = METHODS[template.method]
+    if template.method == "masked":
+        scores = cv2.matchTemplate(image, template.gray, method, mask=template.mask)
+    else:
+        scores = cv2.matchTemplate(image, template.gray, method)
+    if template.method == "sqdiff":
+        scores = 1 - scores
+    # Flat regions and masked matching might produce NaN or infinity
+    return np.nan_to_num(scores, nan=0, posinf=0, neginf=0)
+
+
+def locate(
+    template: Template,
+    image: np.ndarray,
+    confidence: float,
+    small_image: np.ndarray | None = None,
+) -> Match | None:
+    """Locate the best match of a template in a grayscale image.
+
+    :param template: Template to match.
+    :type template: Template
+    :param image: Grayscale image to search in.
+    :type image: np.ndarray
+    :param confidence: Minimum score of a match.
+    :type confidence: float
+    :param small_image: The image downscaled by downscale() to search
+        coarse-to-fine, defaults to None.
+    :type small_image: np.ndarray | None, optional
+    :return: The best match relative to the image, None if not found.
+    :rtype: Match | None
+    """
+    if small_image is not None and can_downscale(template):
+        regions = _get_candidate_regions(template, image, small_image, confidence)
+        if regions is not None:
+            matches = _locate_in_regions(template, image, confidence, regions)
+            return max(matches, key=lambda match: match.score, default=None)
+
+    scores = get_scores(template, image)
+    if scores is None:
+        return None
+    _, score, _, (left, top) = cv2.minMaxLoc(scores)
+    if score < confidence:
+        return None
+    height, width = template.gray.shape
+    return Match(Box(left, top, width, height), float(score))
+
+
+def locate_all(
+    template: Template,
+    image: np.ndarray,
+    confidence: float,
+    small_image: np.ndarray | None = None,
+) -> list[Match]:
+    """Locate all matches of a template in a grayscale image.
+
+    :param template: Template to match.
+    :type template: Template
+    :param image: Grayscale image to search in.
+    :type image: np.ndarray
+    :param confidence: Minimum score of a match.
+    :type confidence: float
+    :param small_image: The image downscaled by downscale() to search
+        coarse-to-fine, defaults to None.
+    :type small_image: np.ndarray | None, optional
+    :return: Matches relative to the image in row-major order.
+    :rtype: list[Match]
+    """
+    if small_image is not None and can_downscale(template):
+        regions = _get_candidate_regions(template, image, small_image, confidence)
+        if regions is not None:
+            return _locate_in_regions(template, image, confidence, regions)
+
+    scores = get_scores(template, image)
+    if scores is None:
+        return []
+    height, width = template.gray.shape
+    tops, lefts = np.nonzero(scores >= confidence)
+    return [
+        Match(Box(int(left), int(top), width, height), float(scores[top, left]))
+        for top, left in zip(tops[:MAX_MATCHES], lefts[:MAX_MATCHES])
+    ]
+
+
+def downscale(image: np.ndarray) -> np.ndarray:
+    """Downscale an image by PYRAMID_SCALE.
+
+    :param image: Image to downscale.
+    :type image: np.ndarray
+    :return: Blurred and downsampled image.
+    :rtype: np.ndarray
+    """
+    return cv2.pyrDown(np.asarray(image))
+
+
+def can_downscale(template: Template) -> bool:
+    """Check if a template is still recognizable after downscaling.
+
+    :param template: Template to check.
+    :type template: Template
+    :return: Whether coarse-to-fine matching can be used.
+    :rtype: bool
+    """
+    side = -(-min(template.gray.shape) // PYRAMID_SCALE) - 2 * PYRAMID_BORDER
+    return side >= PYRAMID_MIN_SIZE
+
+
+def _get_downscaled_template(template: Template) -> Template:
+    """Get the downscaled version of a template, it's created once per template.
+
+    The border is dropped because it's blurred with the padding of the template
+    instead of the screen, its top-left pixel is therefore PYRAMID_BORDER
+    downscaled pixels away from the one of the template.
+
+    :param template: Template to downscale.
+    :type template: Template
+    :return: Downscaled template.
+    :rtype: Template
+    """
+    downscaled = _downscaled_templates.get(template.hash)
+    if downscaled is None:
+        inner = np.s_[PYRAMID_BORDER:-PYRAMID_BORDER, PYRAMID_BORDER:-PYRAMID_BORDER]
+        mask = template.mask
+        if mask is not None:  # Keep fully opaque pixels only
+            mask = np.where(downscale(mask)[inner] == 255, 255, 0).astype(np.uint8)
+        bgr = template.bgr
+        if bgr is not None:  # Scaled variants might be grayscale only
+            bgr = np.ascontiguousarray(downscale(bgr)[inner])
+        downscaled = template._replace(
+            bgr=bgr,
+            gray=np.ascontiguousarray(downscale(template.gray)[inner]),
+            mask=mask,
+        )
+        _downscaled_templates[template.hash] = downscaled
+    return downscaled
+
+
+def _get_candidate_regions(
+    template: Template, image: np.ndarray, small_image: np.ndarray, confidence: float
+) -> list[tuple[int, int, int, int]] | None:
+    """Find the regions that might contain the template with a downscaled search.
+
+    :param template: Template to match.
+    :type template: Template
+    :param image: Grayscale image to search in.
+    :type image: np.ndarray
+    :param small_image: The image downscaled by downscale().
+    :type small_image: np.ndarray
+    :param confidence: Minimum score of a match.
+    :type confidence: float
+    :return: Candidate regions relative to the image, None if the downscaled
+        search can't narrow it down.
+    :rtype: list[tuple[int, int, int, int]] | None
+    """
+    scores = get_scores(_get_downscaled_template(template), small_image)
+    if scores is None:
+        return None
+    candidates = scores >= confidence - PYRAMID_CONFIDENCE_MARGIN
+
+    # Merge adjacent candidates, then map them back with one coarse pixel of slack
+    count, _, stats, _ = cv2.connectedComponentsWithStats(
+        candidates.astype(np.uint8)
+    )
+    if count - 1 > PYRAMID_MAX_CANDIDATES:  # The first one is the background
+        return None
+    height, width = template.gray.shape
+    image_height, image_width = image.shape
+    regions = []
+    for left, top, candidate_width, candidate_height, _ in stats[1:]:
+        # Downscaled top-left positions of the template, including the slack
+        left, top = left - PYRAMID_BORDER - 1, top - PYRAMID_BORDER - 1
+        right, bottom = left + candidate_width + 1, top + candidate_height + 1
+        left = max(left * PYRAMID_SCALE, 0)
+        top = max(top * PYRAMID_SCALE, 0)
+        right = min(right * PYRAMID_SCALE + width, image_width)
+        bottom = min(bottom * PYRAMID_SCALE + height, image_height)
+        regions.append((left, top, right - left, bottom - top))
+
+    area = sum(region[2] * region[3] for region in regions)
+    if area > image.size * PYRAMID_MAX_AREA_RATIO:
+        return None
+    return regions
+
+
+def _locate_in_regions(
+    template: Template,
+    image: np.ndarray,
+    confidence: float,
+    regions: list[tuple[int, int, int, int]],
+) -> list[Match]:
+    """Locate all matches of a template in some regions of an image.
+
+    :param template: Template to match.
+    :type template: Template
+    :param image: Grayscale image to search in.
+    :type image: np.ndarray
+    :param confidence: Minimum score of a match.
+    :type confidence: float
+    :param regions: Regions relative to the image (left, top, width, height).
+    :type regions: list[tuple[int, int, int, int]]
+    :return: Matches relative to the image in row-major order, without duplicates.
+    :rtype: list[Match]
+    """
+    matches = {}
+    for left, top, width, height in regions:
+        crop = image[top : top + height, left : left + width]
+        for match in locate_all(template, crop, confidence):
+            box = Box(match.box.left + left, match.box.top + top, *match.box[2:])
+            matches[(box.top, box.left)] = Match(box, match.score)
+    return [matches[key] for key in sorted(matches)][:MAX_MATCHES]
+
+
+def suppress(matches: list[Match], overlap: float = NMS_OVERLAP) -> list[Match]:
+    """Apply non-maximum suppression, keeping the best match of each object.
+
+    :param matches: Matches of the same template.
+    :type matches: list[Match]
+    :param overlap: Maximum IoU with a better match, defaults to NMS_OVERLAP.
+    :type overlap: float, optional
+    :return: Remaining matches sorted by score in descending order.
+    :rtype: list[Match]
+    """
+    if not matches:
+        return []
+    boxes = np.array([match.box for match in matches], dtype=np.float64)
+    scores = np.array([match.score for match in matches])
+    lefts, tops = boxes[:, 0], boxes[:, 1]
+    rights, bottoms = lefts + boxes[:, 2], tops + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+
+    keep = []
+    order = np.argsort(-scores, kind="stable")
+    while order.size > 0:
+        best, others = order[0], order[1:]
+        keep.append(best)
+        width = np.minimum(rights[best], rights[others]) - np.maximum(
+            lefts[best], lefts[others]
+        )
+        height = np.minimum(bottoms[best], bottoms[others]) - np.maximum(
+            tops[best], tops[others]
+        )
+        intersection = np.clip(width, 0, None) * np.clip(height, 0, None)
+        iou = intersection / (areas[best] + areas[others] - intersection)
+        order = others[iou <= overlap]
+    return [matches[i] for i in keep]
@@ -0,0 +1,82 @@
+"""Module for MotionDetector class.
+
+A bite moves the float in the float camera, while waves and lighting keep
+changing the picture a little all the time. This module measures the motion
+energy of the camera, the mean absolute difference between consecutive frames,
+and follows its usual level with an exponential moving baseline. A bite is a
+frame whose energy stands out from that baseline by a configurable number of
+deviations.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import numpy as np
+
+MOTION_WARMUP = 10  # Frames that only settle the baseline
+MOTION_BASELINE_RATE = 0.05  # Weight of a new frame in the baseline
+MOTION_MIN_DEVIATION = 0.5  # Lower bound of the deviation in gray levels
+MOTION_DOWNSAMPLE = 2  # Only every n-th pixel of every n-th row is compared
+
+
+class MotionDetector:
+    """Motion energy of a region against an adaptive baseline.
+
+    Attributes:
+        trigger (float): Deviations above the baseline that count as motion.
+        previous (np.ndarray | None): Last grayscale frame, None if there's none.
+        timestamp (float | None): Capture time of the last frame.
+        count (int): Number of energies measured.
+        mean (float): Baseline of the energy.
+        deviation (float): Mean absolute deviation of the energy from the baseline.
+    """
+
+    def __init__(self, trigger: float):
+        """Initialize the detector without frames.
+
+        :param trigger: Deviations above the baseline that count as motion.
+        :type trigger: float
+        """
+        self.trigger = trigger
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the frames and the baseline, e.g., when the camera is moved."""
+        self.previous = None
+        self.timestamp = None
+        self.count = 0
+        self.mean = 0.0
+        self.deviation = 0.0
+
+    def update(self, image: np.ndarray, timestamp: float) -> bool:
+        """Measure the motion energy of a new frame.
+
+        :param image: BGR pixels of the region.
+        :type image: np.ndarray
+        :param timestamp: Capture time of the frame, repeated frames are skipped.
+        :type timestamp: float
+        :return: Whether the energy stands out from the baseline.
+        :rtype: bool
+        """
+        if timestamp == self.timestamp:
+            return False
+        self.timestamp = timestamp
+        small = image[::MOTION_DOWNSAMPLE, ::MOTION_DOWNSAMPLE]
+        gray = small.astype(np.float32) @ np.float32([0.114, 0.587, 0.299])
+        previous, self.previous = self.previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return False
+
+        energy = float(np.abs(gray - previous).mean())
+        self.count += 1
+        if self.count == 1:
+            self.mean = energy
+            return False
+        if self.count > MOTION_WARMUP:
+            deviation = max(self.deviation, MOTION_MIN_DEVIATION)
+            if energy > self.mean + self.trigger * deviation:
+                return True  # Keep the motion out of the baseline
+
+        rate = max(MOTION_BASELINE_RATE, 1 / self.count)
+        self.deviation += rate * (abs(energy - self.mean) - self.deviation)
+        self.mean += rate * (energy - self.mean)
+        return False
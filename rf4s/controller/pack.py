@@ -0,0 +1,247 @@
+"""Module for compiled template packs.
+
+A pack stores every template of a language directory in one file, so that the
+templates can be memory-mapped at startup instead of decoding dozens of PNG files,
+and several processes can share the same pages.
+
+Layout:
+    - Header: magic, format version and index length (little-endian).
+    - Index: UTF-8 JSON with the source hash and stamp, the name, shape and hash
+      of every template, and the offsets of its arrays.
+    - Data: raw template arrays, each aligned to PACK_ALIGNMENT bytes.
+
+The matching settings aren't stored, they're applied from
+rf4s.controller.template when the pack is loaded, so editing them doesn't leave
+a stale pack behind. Whether the images have changed is decided by the stamp, the
+names, modification times and sizes of the images, so that checking a pack doesn't
+read every image, and every directory is only checked once per process.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from rf4s.controller.template import (
+    DEFAULT_CONFIDENCE,
+    TEMPLATE_CONFIDENCES,
+    TEMPLATE_REGIONS,
+    Template,
+    get_template_method,
+    load_template,
+)
+
+PACK_MAGIC = b"RF4SPACK"
+PACK_VERSION = 5
+PACK_ALIGNMENT = 64
+HEADER = struct.Struct("<8sII")  # magic, version, index length
+
+ARRAY_KEYS = ("bgr", "gray", "mask")
+
+_indexes = {}  # Indexes of the packs checked by this process, keyed by directory
+
+
+def get_pack_path(image_dir: Path) -> Path:
+    """Get the pack path of a language directory, e.g., static/en -> static/en.pack.
+
+    :param image_dir: Directory containing reference images.
+    :type image_dir: Path
+    :return: Path of the pack file.
+    :rtype: Path
+    """
+    return image_dir.parent / f"{image_dir.name}.pack"
+
+
+def stamp_image_dir(image_dir: Path) -> str:
+    """Calculate a stamp that changes whenever an image in a directory changes.
+
+    Only the file metadata is read, so it's much cheaper than hashing the images.
+
+    :param image_dir: Directory containing reference images.
+    :type image_dir: Path
+    :return: SHA-256 digest of the image names, modification times and sizes.
+    :rtype: str
+    """
+    stats = ((path.stem, path.stat()) for path in sorted(image_dir.glob("*.png")))
+    return _combine_hashes(
+        (name, f"{stat.st_mtime_ns}:{stat.st_size}") for name, stat in stats
+    )
+
+
+def _combine_hashes(pairs) -> str:
+    """Combine (name, hash) pairs into a single digest.
+
+    :param pairs: Iterable of (name, hash) pairs sorted by name.
+    :type pairs: Iterable[tuple[str, str]]
+    :return: SHA-256 digest.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    for name, content_hash in pairs:
+        digest.update(f"{name}:{content_hash}\n".encode())
+    return digest.hexdigest()
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the next multiple of PACK_ALIGNMENT."""
+    return -(-offset // PACK_ALIGNMENT) * PACK_ALIGNMENT
+
+
+def build_pack(image_dir: Path) -> dict:
+    """Compile all images in a directory into a pack next to it.
+
+    :param image_dir: Directory containing reference images.
+    :type image_dir: Path
+    :return: Index of the new pack.
+    :rtype: dict
+    """
+    stamp = stamp_image_dir(image_dir)
+    templates = [load_template(path) for path in sorted(image_dir.glob("*.png"))]
+
+    entries = []
+    arrays = []
+    offset = 0
+    for template in templates:
+        entry = {
+            "name": template.name,
+            "shape": list(template.gray.shape),
+            "hash": template.hash,
+        }
+        for key in ARRAY_KEYS:
+            array = getattr(template, key)
+            if array is None:
+                entry[key] = None
+                continue
+            offset = _align(offset)
+            entry[key] = offset
+            arrays.append((offset, array))
+            offset += array.nbytes
+        entries.append(entry)
+
+    index = {
+        "hash": _combine_hashes((t.name, t.hash) for t in templates),
+        "stamp": stamp,
+        "templates": entries,
+    }
+    index_bytes = json.dumps(index).encode()
+    data_offset = _align(HEADER.size + len(index_bytes))
+
+    pack_path = get_pack_path(image_dir)
+    temp_path = pack_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_bytes)))
+        file.write(index_bytes)
+        for array_offset, array in arrays:
+            file.seek(data_offset + array_offset)
+            file.write(np.ascontiguousarray(array).tobytes())
+    os.replace(temp_path, pack_path)
+    _indexes[image_dir] = index
+    return index
+
+
+def _read_header(file) -> tuple[dict, int]:
+    """Read the index and the data offset of an opened pack.
+
+    :param file: Pack file opened in binary mode.
+    :type file: BinaryIO
+    :raises ValueError: The file is not a pack or has a different version.
+    :return: Index and the offset of the data section.
+    :rtype: tuple[dict, int]
+    """
+    magic, version, index_length = HEADER.unpack(file.read(HEADER.size))
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"Invalid pack file: {file.name}")
+    index = json.loads(file.read(index_length))
+    return index, _align(HEADER.size + index_length)
+
+
+def read_index(pack_path: Path) -> dict | None:
+    """Read the index of a pack without mapping its data.
+
+    :param pack_path: Path of the pack file.
+    :type pack_path: Path
+    :return: Index of the pack, None if it doesn't exist or is invalid.
+    :rtype: dict | None
+    """
+    try:
+        with open(pack_path, "rb") as file:
+            return _read_header(file)[0]
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def ensure_pack(image_dir: Path) -> dict:
+    """Rebuild the pack of a directory if it's missing or out of date.
+
+    A directory that has already been checked by this process isn't checked again.
+
+    :param image_dir: Directory containing reference images.
+    :type image_dir: Path
+    :return: Index of the up-to-date pack.
+    :rtype: dict
+    """
+    if image_dir in _indexes:
+        return _indexes[image_dir]
+    index = read_index(get_pack_path(image_dir))
+    if index is None or index.get("stamp") != stamp_image_dir(image_dir):
+        return build_pack(image_dir)
+    _indexes[image_dir] = index
+    return index
+
+
+def load_pack(pack_path: Path) -> dict[str, Template]:
+    """Memory-map a pack and create templates backed by the mapped pages.
+
+    The matching settings are taken from rf4s.controller.template.
+
+    :param pack_path: Path of the pack file.
+    :type pack_path: Path
+    :return: Templates keyed by base name.
+    :rtype: dict[str, Template]
+    """
+    with open(pack_path, "rb") as file:
+        index, data_offset = _read_header(file)
+    data = np.memmap(pack_path, dtype=np.uint8, mode="r", offset=data_offset)
+
+    templates = {}
+    for entry in index["templates"]:
+        height, width = entry["shape"]
+        shapes = {"bgr": (height, width, 3), "gray": (height, width)}
+        arrays = {
+            key: _get_view(data, entry[key], shapes.get(key, (height, width)))
+            for key in ARRAY_KEYS
+        }
+        name = entry["name"]
+        templates[name] = Template(
+            name,
+            arrays["bgr"],
+            arrays["gray"],
+            arrays["mask"],
+            TEMPLATE_CONFIDENCES.get(name, DEFAULT_CONFIDENCE),
+            get_template_method(name, arrays["mask"]),
+            TEMPLATE_REGIONS.get(name),
+            entry["hash"],
+        )
+    return templates
+
+
+def _get_view(data: np.ndarray, offset: int | None, shape: tuple) -> np.ndarray | None:
+    """Get an array view of the mapped data.
+
+    :param data: Mapped data section.
+    :type data: np.ndarray
+    :param offset: Offset of the array in the data section, None if it's absent.
+    :type offset: int | None
+    :param shape: Shape of the array.
+    :type shape: tuple
+    :return: Read-only view of the array, None if it's absent.
+    :rtype: np.ndarray | None
+    """
+    if offset is None:
+        return None
+    return data[offset : offset + int(np.prod(shape))].reshape(shape)
@@ -0,0 +1,134 @@
+"""Module for CheckPlanner class.
+
+A control loop evaluates a chain of checks every tick and acts on the most
+important positive one. This module orders the checks by their measured cost
+and observed positive rate, so cheap and likely checks run first, and skips the
+checks that can't change the outcome once a more important one is positive.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import logging
+import time
+from typing import Callable
+
+logger = logging.getLogger("rich")
+
+_planners = {}  # Shared by all tackles, keyed by name
+
+
+class CheckStats:
+    """Measurements of a check.
+
+    Attributes:
+        runs (int): Number of evaluations.
+        positives (int): Number of positive evaluations.
+        skips (int): Number of ticks the check wasn't needed.
+        elapsed (float): Total evaluation time in seconds.
+    """
+
+    def __init__(self):
+        """Initialize empty measurements."""
+        self.runs = 0
+        self.positives = 0
+        self.skips = 0
+        self.elapsed = 0.0
+
+    def get_rank(self) -> float:
+        """Get the expected cost per positive result, lower runs earlier.
+
+        :return: Average cost divided by the smoothed positive rate, 0 if the
+            check hasn't been measured yet.
+        :rtype: float
+        """
+        if self.runs == 0:
+            return 0.0
+        positive_rate = (self.positives + 1) / (self.runs + 2)
+        return self.elapsed / self.runs / positive_rate
+
+
+class CheckPlanner:
+    """Cost-aware evaluation order of a chain of checks.
+
+    Attributes:
+        name (str): Name of the chain in the stats.
+        priorities (dict[str, int]): Priority of every check, lower is more
+            important. The most important positive check is the outcome.
+        stats (dict[str, CheckStats]): Measurements keyed by check name.
+    """
+
+    def __init__(self, name: str, priorities: dict[str, int]):
+        """Initialize the planner without measurements.
+
+        :param name: Name of the chain in the stats.
+        :type name: str
+        :param priorities: Priority of every check, lower is more important.
+        :type priorities: dict[str, int]
+        """
+        self.name = name
+        self.priorities = priorities
+        self.stats = {check: CheckStats() for check in priorities}
+
+    def run(self, evaluate: Callable[[str], bool]) -> str | None:
+        """Evaluate the checks and get the most important positive one.
+
+        Once a check is positive, only the more important ones are evaluated.
+
+        :param evaluate: Function evaluating a check by name.
+        :type evaluate: Callable[[str], bool]
+        :return: The most important positive check, None if all are negative.
+        :rtype: str | None
+        """
+        outcome = None
+        for check in sorted(self.priorities, key=lambda c: self.stats[c].get_rank()):
+            stats = self.stats[check]
+            if (
+                outcome is not None
+                and self.priorities[check] >= self.priorities[outcome]
+            ):
+                stats.skips += 1
+                continue
+            start = time.perf_counter()
+            positive = evaluate(check)
+            stats.elapsed += time.perf_counter() - start
+            stats.runs += 1
+            if positive:
+                stats.positives += 1
+                outcome = check
+        return outcome
+
+    def log_stats(self) -> None:
+        """Log the measurements of every check, if the chain has been run."""
+        for check, stats in self.stats.items():
+            if stats.runs == 0:
+                continue
+            logger.info(
+                "Planner '%s' %s: %d runs, %d skips, %.1f%% positive, %.2f ms/run",
+                self.name,
+                check,
+                stats.runs,
+                stats.skips,
+                stats.positives / stats.runs * 100,
+                stats.elapsed / stats.runs * 1000,
+            )
+
+
+def get_planner(name: str, priorities: dict[str, int]) -> CheckPlanner:
+    """Get the planner of a chain, it's created once and shared afterwards.
+
+    :param name: Name of the chain, e.g., "spin/retrieve".
+    :type name: str
+    :param priorities: Priority of every check, lower is more important.
+    :type priorities: dict[str, int]
+    :return: The planner of the chain.
+    :rtype: CheckPlanner
+    """
+    if name not in _planners:
+        _planners[name] = CheckPlanner(name, priorities)
+    return _planners[name]
+
+
+def log_stats() -> None:
+    """Log the measurements of all planners."""
+    for planner in _planners.values():
+        planner.log_stats()
@@ -0,0 +1,154 @@
+"""Module for PixelProbe and ProbeStrip classes.
+
+This module answers all pixel predicates of the HUD at once. The probed pixels are
+read from one capture of the strip that contains them, then compared against their
+color ranges with vectorized numpy operations.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from rf4s.controller.frame import FrameSnapshot
+
+ColorRange = tuple[tuple[int, int, int], tuple[int, int, int]]
+
+
+class PixelProbe(NamedTuple):
+    """A predicate on the color of a single pixel.
+
+    Attributes:
+        coord (tuple[int, int]): Absolute coordinate (x, y).
+        ranges (tuple[ColorRange, ...]): Inclusive RGB ranges (lower, upper),
+            the probe is positive if the pixel is in any of them.
+        inverted (bool): Whether to negate the result.
+    """
+
+    coord: tuple[int, int]
+    ranges: tuple[ColorRange, ...]
+    inverted: bool = False
+
+
+def match_colors(
+    coord: list[int], *colors: tuple[int, int, int], tolerance: int = 0
+) -> PixelProbe:
+    """Create a probe that is positive if the pixel has one of the colors.
+
+    :param coord: Absolute coordinate (x, y).
+    :type coord: list[int]
+    :param colors: RGB colors to compare with.
+    :type colors: tuple[int, int, int]
+    :param tolerance: Maximum difference of each channel, defaults to 0.
+    :type tolerance: int, optional
+    :return: The probe.
+    :rtype: PixelProbe
+    """
+    ranges = tuple(
+        (
+            tuple(max(c - tolerance, 0) for c in color),
+            tuple(min(c + tolerance, 255) for c in color),
+        )
+        for color in colors
+    )
+    return PixelProbe(tuple(coord), ranges)
+
+
+def exceed_level(coord: list[int], level: int, inverted: bool = False) -> PixelProbe:
+    """Create a probe that is positive if all channels of the pixel exceed a level.
+
+    :param coord: Absolute coordinate (x, y).
+    :type coord: list[int]
+    :param level: Exclusive lower bound of every channel.
+    :type level: int
+    :param inverted: Whether to negate the result, defaults to False.
+    :type inverted: bool, optional
+    :return: The probe.
+    :rtype: PixelProbe
+    """
+    return PixelProbe(tuple(coord), (((level + 1,) * 3, (255,) * 3),), inverted)
+
+
+def measure_fill(row: np.ndarray, min_saturation: int) -> float:
+    """Measure the run of colored pixels from the start of a bar.
+
+    :param row: RGB pixels of the bar from where it starts filling, shape
+        (length, 3).
+    :type row: np.ndarray
+    :param min_saturation: Minimum difference between the largest and the smallest
+        channel of a filled pixel, the empty bar is gray.
+    :type min_saturation: int
+    :return: Length of the run relative to the bar, in [0, 1].
+    :rtype: float
+    """
+    if len(row) == 0:
+        return 0.0
+    filled = np.ptp(row.astype(np.int16), axis=1) >= min_saturation
+    run = len(row) if filled.all() else int(np.argmin(filled))
+    return run / len(row)
+
+
+class ProbeStrip:
+    """A set of pixel probes evaluated together.
+
+    Attributes:
+        names (list[str]): Names of the probes.
+        region (tuple[int, int, int, int]): Smallest region containing all probes.
+    """
+
+    def __init__(self, probes: dict[str, PixelProbe]):
+        """Stack the probes into arrays for vectorized comparisons.
+
+        :param probes: Probes keyed by name.
+        :type probes: dict[str, PixelProbe]
+        """
+        self.names = list(probes)
+        self._coords = np.array([probe.coord for probe in probes.values()])
+        self._inverted = np.array([probe.inverted for probe in probes.values()])
+
+        # One row per color range, owners map the rows back to their probes
+        owners, lowers, uppers = [], [], []
+        for i, probe in enumerate(probes.values()):
+            for lower, upper in probe.ranges:
+                owners.append(i)
+                lowers.append(lower)
+                uppers.append(upper)
+        self._owners = np.array(owners)
+        self._lowers = np.array(lowers)
+        self._uppers = np.array(uppers)
+
+        left, top = self._coords.min(axis=0)
+        right, bottom = self._coords.max(axis=0)
+        self.region = (
+            int(left),
+            int(top),
+            int(right - left + 1),
+            int(bottom - top + 1),
+        )
+
+    def read(self, frame: FrameSnapshot | None = None) -> np.ndarray:
+        """Read the probed pixels.
+
+        :param frame: Frame to read from, defaults to a new capture of the strip.
+        :type frame: FrameSnapshot | None, optional
+        :return: RGB colors of the probes, shape (number of probes, 3).
+        :rtype: np.ndarray
+        """
+        if frame is None:
+            frame = FrameSnapshot.grab(self.region)
+        return frame.pixels(self._coords)
+
+    def evaluate(self, frame: FrameSnapshot | None = None) -> dict[str, bool]:
+        """Evaluate all probes.
+
+        :param frame: Frame to read from, defaults to a new capture of the strip.
+        :type frame: FrameSnapshot | None, optional
+        :return: Results keyed by probe name.
+        :rtype: dict[str, bool]
+        """
+        pixels = self.read(frame)[self._owners]
+        in_range = ((pixels >= self._lowers) & (pixels <= self._uppers)).all(axis=1)
+        hits = np.zeros(len(self.names), dtype=bool)
+        np.logical_or.at(hits, self._owners, in_range)
+        return dict(zip(self.names, (hits ^ self._inverted).tolist()))
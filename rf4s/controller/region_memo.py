@@ -0,0 +1,148 @@
+"""Module for RegionMemo class.
+
+Most of the time the HUD regions are identical between two polls, e.g., while
+waiting for a bite or between retrieval ticks. This module remembers the
+matching results keyed by the template and a checksum of the searched region,
+so an unchanged region is answered without matching the template again. Only
+small regions of static HUD icons are memoized, larger regions overlap the game
+world, whose pixels change every frame, so they would only fill the memo.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import logging
+import zlib
+from collections import Counter, OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from rf4s.controller.frame import FrameSnapshot
+from rf4s.controller.matcher import Match
+from rf4s.controller.window_state import WindowState
+
+logger = logging.getLogger("rich")
+
+REGION_MEMO_SIZE = 256  # Results kept, the least recently used ones are dropped
+
+# Templates searched in static HUD regions
+MEMO_TEMPLATES = (
+    "fish_icon",
+    "bait_icon",
+)
+
+
+class MemoKey(NamedTuple):
+    """Everything a matching result depends on.
+
+    Attributes:
+        name (str): Base name of the template.
+        confidence (float): Minimum score of a match.
+        region (tuple[int, int, int, int]): Absolute region that is searched.
+        checksum (int): CRC-32 of the pixels in the region.
+    """
+
+    name: str
+    confidence: float
+    region: tuple[int, int, int, int]
+    checksum: int
+
+
+def get_bounds(
+    *regions: tuple[int, int, int, int] | None,
+) -> tuple[int, int, int, int]:
+    """Get the smallest region containing all regions.
+
+    :param regions: Regions (left, top, width, height), None ones are ignored.
+    :type regions: tuple[int, int, int, int] | None
+    :return: Bounding region.
+    :rtype: tuple[int, int, int, int]
+    """
+    regions = np.array([region for region in regions if region is not None])
+    left, top = regions[:, :2].min(axis=0)
+    right, bottom = (regions[:, :2] + regions[:, 2:]).max(axis=0)
+    return int(left), int(top), int(right - left), int(bottom - top)
+
+
+class RegionMemo(WindowState):
+    """Matching results of regions keyed by their content.
+
+    Attributes:
+        results (OrderedDict[MemoKey, Match | None]): Results, the most recently
+            used ones last.
+        hits (Counter): Number of results reused, keyed by template name.
+        misses (Counter): Number of regions matched, keyed by template name.
+    """
+
+    def __init__(self):
+        """Initialize an empty memo."""
+        super().__init__()
+        self.results = OrderedDict()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def clear(self) -> None:
+        """Drop all results, e.g., when the window has been moved or resized."""
+        self.results.clear()
+
+    @staticmethod
+    def get_key(
+        name: str,
+        confidence: float,
+        region: tuple[int, int, int, int],
+        frame: FrameSnapshot,
+    ) -> MemoKey:
+        """Checksum a region of a frame.
+
+        :param name: Base name of the template.
+        :type name: str
+        :param confidence: Minimum score of a match.
+        :type confidence: float
+        :param region: Absolute region that is searched.
+        :type region: tuple[int, int, int, int]
+        :param frame: Frame to search in.
+        :type frame: FrameSnapshot
+        :return: Key of the result.
+        :rtype: MemoKey
+        """
+        checksum = zlib.crc32(np.ascontiguousarray(frame.crop(region)))
+        return MemoKey(name, confidence, region, checksum)
+
+    def get(self, key: MemoKey) -> tuple[bool, Match | None]:
+        """Get the result of an unchanged region.
+
+        :param key: Key of the result.
+        :type key: MemoKey
+        :return: Whether the result is memoized, and the result.
+        :rtype: tuple[bool, Match | None]
+        """
+        if key in self.results:
+            self.hits[key.name] += 1
+            self.results.move_to_end(key)
+            return True, self.results[key]
+        self.misses[key.name] += 1
+        return False, None
+
+    def put(self, key: MemoKey, match: Match | None) -> None:
+        """Memoize the result of a region.
+
+        :param key: Key of the result.
+        :type key: MemoKey
+        :param match: Result of matching, None if the template is not found.
+        :type match: Match | None
+        """
+        self.results[key] = match
+        if len(self.results) > REGION_MEMO_SIZE:
+            self.results.popitem(last=False)
+
+    def log_stats(self) -> None:
+        """Log the hit rate of every template, if the memo has been used."""
+        for name in sorted(self.hits + self.misses):
+            lookups = self.hits[name] + self.misses[name]
+            logger.info(
+                "Region memo '%s': %d/%d unchanged (%.1f%%)",
+                name,
+                self.hits[name],
+                lookups,
+                self.hits[name] / lookups * 100,
+            )
@@ -0,0 +1,166 @@
+"""Module for ScreenClassifier class.
+
+A template search answers one question, so finding out which screen is shown by
+searching for the elements of every screen costs several full-window matches.
+This module identifies the screen in one step instead. Every screen gets a
+signature, a grid of pixels sampled in a region only that screen shows, recorded
+whenever one of its marker templates is matched. Pixels that change between the
+recordings, like the game world behind the HUD, are dropped from the signature,
+so only the characteristic ones are compared with the frame.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from rf4s.controller.frame import FrameSnapshot
+from rf4s.controller.window_state import WindowState
+
+
+class Screen(NamedTuple):
+    """A screen of the game.
+
+    Attributes:
+        name (str): Name of the screen.
+        markers (tuple[str, ...]): Templates that are only shown on the screen.
+        overlay (bool): Whether the screen is a popup that might be shown over
+            another screen.
+    """
+
+    name: str
+    markers: tuple[str, ...]
+    overlay: bool = False
+
+
+SCREENS = {
+    screen.name: screen
+    for screen in (
+        Screen(
+            "fishing",
+            ("ready", "movement", "broke", "lure_is_broken", "0m", "5m", "wheel"),
+        ),
+        Screen("catch", ("keep",), overlay=True),
+        Screen("disconnected", ("disconnected",), overlay=True),
+        Screen("ticket_expired", ("ticket",), overlay=True),
+        Screen("inventory", ("scrollbar",)),
+        Screen("quick_menu", ("favorite",), overlay=True),
+        Screen("control_panel", ("quit",)),
+        Screen("crafting", ("make",)),
+    )
+}
+# Screen names keyed by marker template
+MARKERS = {
+    marker: screen.name for screen in SCREENS.values() for marker in screen.markers
+}
+
+SIGNATURE_GRID = (16, 8)  # Sampled pixels along the width and the height
+SIGNATURE_TOLERANCE = 24  # Maximum difference of each channel
+SIGNATURE_MIN_PIXELS = 16  # Signatures with fewer stable pixels are ignored
+SIGNATURE_MATCH_RATIO = 0.9  # Minimum ratio of stable pixels that must match
+
+
+class Signature(NamedTuple):
+    """Sampled pixels of a screen.
+
+    Attributes:
+        coords (np.ndarray): Absolute coordinates (x, y), shape (n, 2).
+        colors (np.ndarray): RGB colors of the first recording, shape (n, 3).
+        stable (np.ndarray): Pixels that didn't change between recordings,
+            shape (n,).
+    """
+
+    coords: np.ndarray
+    colors: np.ndarray
+    stable: np.ndarray
+
+
+def get_grid(region: tuple[int, int, int, int]) -> np.ndarray:
+    """Spread the sampled pixels evenly over a region.
+
+    :param region: Absolute region (left, top, width, height).
+    :type region: tuple[int, int, int, int]
+    :return: Absolute coordinates (x, y), shape (n, 2).
+    :rtype: np.ndarray
+    """
+    left, top, width, height = region
+    xs = np.unique(np.linspace(left, left + width - 1, SIGNATURE_GRID[0]).round())
+    ys = np.unique(np.linspace(top, top + height - 1, SIGNATURE_GRID[1]).round())
+    return np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2).astype(int)
+
+
+def is_possible(name: str, screens: frozenset[str]) -> bool:
+    """Check if a screen might be shown according to a classification.
+
+    :param name: Name of the screen.
+    :type name: str
+    :param screens: Identified screens, empty if the screen is unknown.
+    :type screens: frozenset[str]
+    :return: Whether checks for the screen are worth running.
+    :rtype: bool
+    """
+    return not screens or name in screens or SCREENS[name].overlay
+
+
+class ScreenClassifier(WindowState):
+    """Signatures of the screens in a game window.
+
+    Attributes:
+        signatures (dict[str, Signature]): Signatures keyed by screen name.
+    """
+
+    def __init__(self):
+        """Initialize a classifier without signatures."""
+        super().__init__()
+        self.signatures = {}
+
+    def clear(self) -> None:
+        """Drop all signatures, e.g., when the window has been moved or resized."""
+        self.signatures.clear()
+
+    def learn(
+        self, name: str, region: tuple[int, int, int, int], frame: FrameSnapshot
+    ) -> None:
+        """Record the signature of a screen that is known to be shown.
+
+        Recording the same region again keeps only the pixels that didn't change.
+
+        :param name: Name of the screen.
+        :type name: str
+        :param region: Absolute region only the screen shows.
+        :type region: tuple[int, int, int, int]
+        :param frame: Frame showing the screen.
+        :type frame: FrameSnapshot
+        """
+        coords = get_grid(region)
+        if not frame.contains(coords).all():  # Only part of the window is captured
+            return
+        colors = frame.pixels(coords).astype(np.int16)
+        signature = self.signatures.get(name)
+        if signature is None or not np.array_equal(signature.coords, coords):
+            stable = np.ones(len(coords), dtype=bool)
+            self.signatures[name] = Signature(coords, colors, stable)
+            return
+        changed = (np.abs(colors - signature.colors) > SIGNATURE_TOLERANCE).any(axis=1)
+        signature.stable[changed] = False
+
+    def classify(self, frame: FrameSnapshot) -> frozenset[str]:
+        """Identify the screens shown in a frame by their signatures.
+
+        :param frame: Frame to classify.
+        :type frame: FrameSnapshot
+        :return: Names of the matching screens, empty if the screen is unknown.
+        :rtype: frozenset[str]
+        """
+        screens = set()
+        for name, signature in self.signatures.items():
+            coords = signature.coords[signature.stable]
+            if len(coords) < SIGNATURE_MIN_PIXELS or not frame.contains(coords).all():
+                continue
+            colors = frame.pixels(coords).astype(np.int16)
+            diffs = np.abs(colors - signature.colors[signature.stable])
+            matched = (diffs <= SIGNATURE_TOLERANCE).all(axis=1)
+            if matched.mean() >= SIGNATURE_MATCH_RATIO:
+                screens.add(name)
+        return frozenset(screens)
@@ -0,0 +1,215 @@
+"""Module for SpeciesIndex class.
+
+The species of a captured fish is shown as the title of the catch dialog, always
+starting at the same spot. Matching every species template against the window
+costs one search per species, so the time to keep or release a fish grows with
+the number of species. This module stacks all species templates, trimmed to
+their text, and scores all of them against the title region in one vectorized
+pass of masked normalized cross-correlation. The title is located from the keep
+button of the dialog, and trusted once a species has been classified there.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+from pyscreeze import Box
+
+from rf4s.controller.frame import FrameSnapshot
+from rf4s.controller.window_state import WindowState
+
+SPECIES_LEVEL = 128  # Brighter pixels belong to the title text
+SPECIES_SHIFT = 3  # Pixels the text may start away from the title anchor
+SEED_SHIFT = 40  # Pixels the title may be away from where the keep button puts it
+SEED_MAX_FILL = 0.3  # Maximum ratio of bright pixels around a title on a dark dialog
+# Top-left of the title text relative to the keep button in reference pixels,
+# replaced by the measured one once a species is found in the window
+TITLE_OFFSET = (-250, -420)
+
+
+class Classification(NamedTuple):
+    """Result of a species classification.
+
+    Attributes:
+        species (str | None): Best scoring species, None if it's below its
+            confidence or the title hasn't been located yet.
+        margin (float): Score difference between the best and the second best
+            species.
+        scores (dict[str, float]): Scores of all species.
+    """
+
+    species: str | None
+    margin: float
+    scores: dict[str, float]
+
+
+def trim(image: np.ndarray) -> tuple[tuple[int, int], np.ndarray]:
+    """Trim a grayscale title image to the bounding box of its text.
+
+    :param image: Grayscale image.
+    :type image: np.ndarray
+    :return: Offset (x, y) of the text in the image, and the text pixels.
+    :rtype: tuple[tuple[int, int], np.ndarray]
+    """
+    mask = image > SPECIES_LEVEL
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if len(rows) == 0:
+        return (0, 0), image
+    return (
+        (int(cols[0]), int(rows[0])),
+        image[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1],
+    )
+
+
+class SpeciesIndex(WindowState):
+    """Stacked species templates of the catch dialog title.
+
+    Attributes:
+        scale (float): Size of the HUD relative to the reference images.
+        title_offset (tuple[int, int]): Top-left of the title text relative to
+            the keep button.
+        names (list[str]): Species in the stack.
+        confidences (np.ndarray): Minimum score of every species, shape (n,).
+        offsets (dict[str, tuple[int, int]]): Offset of the text in every
+            template, keyed by species.
+        anchor (tuple[int, int] | None): Absolute top-left of the title text, None
+            if the title hasn't been located yet.
+        confirmed (bool): Whether a species has been found at the anchor, a
+            negative result is only trusted afterwards.
+    """
+
+    def __init__(self, templates: dict[str, tuple[np.ndarray, float]], scale: float):
+        """Trim and stack the templates.
+
+        :param templates: Grayscale templates and confidences keyed by species.
+        :type templates: dict[str, tuple[np.ndarray, float]]
+        :param scale: Size of the HUD relative to the reference images.
+        :type scale: float
+        """
+        super().__init__()
+        self.scale = scale
+        self.title_offset = (
+            round(TITLE_OFFSET[0] * scale),
+            round(TITLE_OFFSET[1] * scale),
+        )
+        self.names = list(templates)
+        self.confidences = np.array([entry[1] for entry in templates.values()])
+        self.offsets = {}
+        texts = []
+        for name, (image, _) in templates.items():
+            self.offsets[name], text = trim(image)
+            texts.append(text)
+
+        height = max((text.shape[0] for text in texts), default=0)
+        width = max((text.shape[1] for text in texts), default=0)
+        self._shape = (height, width)
+        self._masks = np.zeros((len(texts), height, width), dtype=np.float32)
+        self._stack = np.zeros((len(texts), height, width), dtype=np.float32)
+        for i, text in enumerate(texts):
+            h, w = text.shape
+            pixels = text.astype(np.float32) - text.mean()
+            self._masks[i, :h, :w] = 1
+            self._stack[i, :h, :w] = pixels / max(np.linalg.norm(pixels), 1e-6)
+        self._sizes = self._masks.sum(axis=(1, 2))
+
+        self.anchor = None
+        self.confirmed = False
+
+    def clear(self) -> None:
+        """Forget the anchor, e.g., when the window has been moved or resized."""
+        self.anchor = None
+        self.confirmed = False
+
+    def seed(self, frame: FrameSnapshot, keep: Box) -> None:
+        """Locate the title by the keep button of the dialog.
+
+        The title is the topmost text around where the keep button puts it. The
+        anchor is only a candidate until a species is classified there. Nothing is
+        located if the region isn't mostly dark like the dialog.
+
+        :param frame: Frame showing the catch dialog.
+        :type frame: FrameSnapshot
+        :param keep: Box of the keep button in absolute screen coordinates.
+        :type keep: Box
+        """
+        height, width = self._shape
+        region = (
+            keep.left + self.title_offset[0] - SEED_SHIFT,
+            keep.top + self.title_offset[1] - SEED_SHIFT,
+            width + SEED_SHIFT * 2,
+            height + SEED_SHIFT * 2,
+        )
+        roi = frame.crop(region)
+        if roi.size == 0:
+            return
+        gray = roi.astype(np.float32) @ np.float32([0.114, 0.587, 0.299])
+        mask = gray > SPECIES_LEVEL
+        rows = np.flatnonzero(mask.any(axis=1))
+        if len(rows) == 0 or mask.mean() > SEED_MAX_FILL:
+            return
+        cols = np.flatnonzero(mask[rows[0] : rows[0] + height].any(axis=0))
+        self.anchor = (region[0] + int(cols[0]), region[1] + int(rows[0]))
+
+    def learn(self, name: str, box: Box, keep: Box | None = None) -> None:
+        """Locate the title by a species template matched in the window.
+
+        :param name: Matched species.
+        :type name: str
+        :param box: Matched box in absolute screen coordinates.
+        :type box: Box
+        :param keep: Box of the keep button to measure the title from, defaults
+            to None.
+        :type keep: Box | None, optional
+        """
+        anchor = (box.left + self.offsets[name][0], box.top + self.offsets[name][1])
+        if keep is not None:
+            self.title_offset = (anchor[0] - keep.left, anchor[1] - keep.top)
+        self.anchor = anchor
+        self.confirmed = True
+
+    def classify(self, frame: FrameSnapshot) -> Classification:
+        """Score all species against the title in one pass.
+
+        :param frame: Frame showing the catch dialog.
+        :type frame: FrameSnapshot
+        :return: The best species, its margin and the scores of all species.
+        :rtype: Classification
+        """
+        if self.anchor is None or not self.names:
+            return Classification(None, 0.0, {})
+        height, width = self._shape
+        region = (
+            self.anchor[0] - SPECIES_SHIFT,
+            self.anchor[1] - SPECIES_SHIFT,
+            width + SPECIES_SHIFT * 2,
+            height + SPECIES_SHIFT * 2,
+        )
+        roi = frame.crop(region)
+        if roi.shape[:2] != (region[3], region[2]):  # The title is cut off
+            return Classification(None, 0.0, {})
+
+        gray = roi.astype(np.float32) @ np.float32([0.114, 0.587, 0.299])
+        windows = np.lib.stride_tricks.sliding_window_view(gray, self._shape)
+        windows = windows.reshape(-1, height * width)
+        stack = self._stack.reshape(len(self.names), -1)
+        masks = self._masks.reshape(len(self.names), -1)
+
+        # Masked ZNCC, the templates are already zero-mean and unit-norm
+        numerators = windows @ stack.T
+        sums = windows @ masks.T
+        squares = (windows * windows) @ masks.T
+        variances = np.maximum(squares - sums * sums / self._sizes, 1e-6)
+        scores = (numerators / np.sqrt(variances)).max(axis=0)
+
+        order = np.argsort(scores)[::-1]
+        best = order[0]
+        margin = float(scores[best] - scores[order[1]]) if len(order) > 1 else 1.0
+        species = None
+        if scores[best] >= self.confidences[best]:
+            species = self.names[best]
+            self.confirmed = True
+        return Classification(
+            species, margin, dict(zip(self.names, scores.astype(float)))
+        )
@@ -0,0 +1,104 @@
+"""Module for StatBars class.
+
+The energy, hunger and comfort bars are drawn next to their icons, filled from
+the left with a single color. This module remembers where the icons are once
+they've been found, and reads the fill level of every bar from one capture
+covering all of them, as the length of the run of pixels sharing the color of
+the first one.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import numpy as np
+
+from rf4s.controller.frame import FrameSnapshot
+from rf4s.controller.window_state import WindowState
+
+# Icon template and start of the bar relative to the icon center, keyed by stat
+STAT_BARS = {
+    "energy": ("energy", 19),
+    "hunger": ("food", 18),
+    "comfort": ("comfort", 18),
+}
+STAT_BAR_LENGTH = 152
+STAT_BAR_TOLERANCE = 8  # Maximum difference of each channel in a filled bar
+
+
+def get_fill_level(row: np.ndarray) -> float:
+    """Measure the run of pixels with the color of the first one.
+
+    :param row: Pixels of the bar from left to right, shape (length, 3).
+    :type row: np.ndarray
+    :return: Length of the run relative to the bar, in [0, 1].
+    :rtype: float
+    """
+    if len(row) == 0:
+        return 0.0
+    diffs = np.abs(row.astype(np.int16) - row[0].astype(np.int16))
+    filled = (diffs <= STAT_BAR_TOLERANCE).all(axis=1)
+    run = len(row) if filled.all() else int(np.argmin(filled))
+    return run / len(row)
+
+
+class StatBars(WindowState):
+    """Located stat bars of a game window.
+
+    Attributes:
+        scale (float): Size of the HUD relative to the reference images.
+        anchors (dict[str, tuple[int, int]]): Absolute icon centers keyed by stat.
+    """
+
+    def __init__(self, scale: float):
+        """Initialize the bars without anchors.
+
+        :param scale: Size of the HUD relative to the reference images.
+        :type scale: float
+        """
+        super().__init__()
+        self.scale = scale
+        self.anchors = {}
+
+    def clear(self) -> None:
+        """Drop all anchors, e.g., when the window has been moved or resized."""
+        self.anchors.clear()
+
+    def get_row(self, name: str) -> tuple[int, int, int, int]:
+        """Get the absolute region of a located bar.
+
+        :param name: Name of the stat.
+        :type name: str
+        :return: Region (left, top, width, height) one pixel high.
+        :rtype: tuple[int, int, int, int]
+        """
+        x, y = self.anchors[name]
+        offset = round(STAT_BARS[name][1] * self.scale)
+        return x + offset, y, round(STAT_BAR_LENGTH * self.scale), 1
+
+    def get_region(self) -> tuple[int, int, int, int] | None:
+        """Get the smallest region containing all located bars.
+
+        :return: Absolute region, None if no bar is located.
+        :rtype: tuple[int, int, int, int] | None
+        """
+        if not self.anchors:
+            return None
+        rows = np.array([self.get_row(name) for name in self.anchors])
+        left, top = rows[:, :2].min(axis=0)
+        right, bottom = (rows[:, :2] + rows[:, 2:]).max(axis=0)
+        return int(left), int(top), int(right - left), int(bottom - top)
+
+    def read(self, frame: FrameSnapshot) -> dict[str, float | None]:
+        """Read the fill levels of all bars.
+
+        :param frame: Frame containing the located bars.
+        :type frame: FrameSnapshot
+        :return: Fill levels in [0, 1] keyed by stat, None if not located or
+            outside the frame.
+        :rtype: dict[str, float | None]
+        """
+        levels = dict.fromkeys(STAT_BARS)
+        for name in self.anchors:
+            pixels = frame.crop(self.get_row(name))
+            if len(pixels) > 0:
+                levels[name] = get_fill_level(pixels[0])
+        return levels
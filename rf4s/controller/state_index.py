@@ -0,0 +1,239 @@
+"""Module for StateIndex and HashIndex classes.
+
+Dialogs and popups are always shown at the same spot, so once a dialog has been
+found, the region around it tells whether it's shown without matching the
+template again. This module keeps a perceptual hash (dHash) of that region for
+every state seen so far, and looks up the state of a new frame by its hash
+within a Hamming distance. Frames whose hash isn't close to any known state are
+matched as usual and their result becomes a new state.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from typing import Any, NamedTuple
+
+import cv2
+import numpy as np
+
+from rf4s.controller.frame import FrameSnapshot
+from rf4s.controller.matcher import Match
+from rf4s.controller.window_state import WindowState
+
+# Templates of the dialogs and popups polled by the idle loops
+STATE_TEMPLATES = (
+    "keep",
+    "harvest_confirm",
+    "ok_black",
+    "ok_white",
+    "warning",
+    "quit",
+    "yes",
+)
+
+HASH_SIZE = 8  # The hash has HASH_SIZE * HASH_SIZE bits
+STATE_HASH_THRESHOLD = 6  # Maximum Hamming distance to a known state
+STATE_MAX_ENTRIES = 64  # Known states per template, the oldest ones are dropped
+STATE_ROI_MARGIN = 4  # Extra pixels around the dialog
+
+
+def dhash(image: np.ndarray) -> int:
+    """Calculate the difference hash of a grayscale image.
+
+    :param image: Grayscale image.
+    :type image: np.ndarray
+    :return: Hash whose bits tell if a pixel is brighter than its left neighbor.
+    :rtype: int
+    """
+    small = cv2.resize(image, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class HashIndex:
+    """Values keyed by hashes, looked up within a Hamming distance.
+
+    The hash is split into threshold + 1 chunks, two hashes within the distance
+    share at least one chunk, so only the entries in the buckets of the chunks
+    are compared (multi-index hashing).
+
+    Attributes:
+        threshold (int): Maximum Hamming distance of a lookup.
+        max_entries (int): Number of entries kept, the oldest ones are dropped.
+        entries (dict[int, Any]): Values keyed by hash, oldest first.
+    """
+
+    def __init__(self, threshold: int, max_entries: int):
+        """Initialize an empty index.
+
+        :param threshold: Maximum Hamming distance of a lookup.
+        :type threshold: int
+        :param max_entries: Number of entries kept.
+        :type max_entries: int
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries = {}
+        bits = HASH_SIZE * HASH_SIZE
+        bounds = np.linspace(0, bits, threshold + 2).round().astype(int)
+        self._chunks = [
+            (int(start), (1 << int(end - start)) - 1)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        self._buckets = [{} for _ in self._chunks]
+
+    def _get_chunks(self, key: int) -> list[int]:
+        return [(key >> shift) & mask for shift, mask in self._chunks]
+
+    def add(self, key: int, value: Any) -> None:
+        """Add or replace an entry, dropping the oldest one if the index is full.
+
+        :param key: Hash of the entry.
+        :type key: int
+        :param value: Value of the entry.
+        :type value: Any
+        """
+        if key in self.entries:
+            del self.entries[key]
+        elif len(self.entries) >= self.max_entries:
+            self._remove(next(iter(self.entries)))
+        self.entries[key] = value
+        for bucket, chunk in zip(self._buckets, self._get_chunks(key)):
+            bucket.setdefault(chunk, set()).add(key)
+
+    def _remove(self, key: int) -> None:
+        del self.entries[key]
+        for bucket, chunk in zip(self._buckets, self._get_chunks(key)):
+            bucket[chunk].discard(key)
+            if not bucket[chunk]:
+                del bucket[chunk]
+
+    def lookup(self, key: int) -> tuple[bool, Any]:
+        """Find the value of the closest hash within the threshold.
+
+        :param key: Hash to look up.
+        :type key: int
+        :return: Whether a close hash is found, and its value.
+        :rtype: tuple[bool, Any]
+        """
+        best_distance, best_value = self.threshold + 1, None
+        for bucket, chunk in zip(self._buckets, self._get_chunks(key)):
+            for candidate in bucket.get(chunk, ()):
+                distance = (candidate ^ key).bit_count()
+                if distance < best_distance:
+                    best_distance, best_value = distance, self.entries[candidate]
+        return best_distance <= self.threshold, best_value
+
+
+class Lookup(NamedTuple):
+    """Result of a state lookup.
+
+    Attributes:
+        hash (int | None): Hash of the region, None if the dialog hasn't been
+            found yet.
+        found (bool): Whether the state is known.
+        match (Match | None): Known match of the template, None if it's absent.
+    """
+
+    hash: int | None
+    found: bool
+    match: Match | None
+
+
+class StateIndex(WindowState):
+    """Known states of the dialog regions in a game window.
+
+    Attributes:
+        rois (dict[str, tuple[int, int, int, int]]): Absolute regions of the
+            dialogs keyed by template name.
+        indexes (dict[str, HashIndex]): Known states keyed by template name.
+        hits (int): Number of lookups answered by a known state.
+        misses (int): Number of lookups that need matching.
+    """
+
+    def __init__(self):
+        """Initialize an index without states."""
+        super().__init__()
+        self.rois = {}
+        self.indexes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Drop all states, e.g., when the window has been moved or resized."""
+        self.rois.clear()
+        self.indexes.clear()
+
+    def lookup(self, name: str, frame: FrameSnapshot) -> Lookup:
+        """Look up the state of a dialog region in a frame.
+
+        :param name: Base name of the template.
+        :type name: str
+        :param frame: Frame containing the whole window.
+        :type frame: FrameSnapshot
+        :return: The hash of the region and its known state if there's one.
+        :rtype: Lookup
+        """
+        roi = self.rois.get(name)
+        if roi is None:
+            return Lookup(None, False, None)
+        key = self._get_hash(roi, frame)
+        found, match = self.indexes[name].lookup(key)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return Lookup(key, found, match)
+
+    def record(
+        self, name: str, frame: FrameSnapshot, lookup: Lookup, match: Match | None
+    ) -> None:
+        """Remember the matching result of a region as a known state.
+
+        The region is placed around the dialog the first time it's found, and
+        moved if the dialog is found outside of it.
+
+        :param name: Base name of the template.
+        :type name: str
+        :param frame: Frame the template is matched in.
+        :type frame: FrameSnapshot
+        :param lookup: Result of the lookup before matching.
+        :type lookup: Lookup
+        :param match: Result of matching, None if the template is not found.
+        :type match: Match | None
+        """
+        if match is not None and not self._is_inside(match, self.rois.get(name)):
+            self.rois[name] = self._get_roi(match)
+            self.indexes[name] = HashIndex(STATE_HASH_THRESHOLD, STATE_MAX_ENTRIES)
+            lookup = lookup._replace(hash=self._get_hash(self.rois[name], frame))
+        if lookup.hash is not None:
+            self.indexes[name].add(lookup.hash, match)
+
+    @staticmethod
+    def _get_hash(roi: tuple[int, int, int, int], frame: FrameSnapshot) -> int:
+        return dhash(cv2.cvtColor(frame.crop(roi), cv2.COLOR_BGR2GRAY))
+
+    @staticmethod
+    def _is_inside(match: Match, roi: tuple[int, int, int, int] | None) -> bool:
+        if roi is None:
+            return False
+        left, top, width, height = match.box
+        return (
+            left >= roi[0]
+            and top >= roi[1]
+            and left + width <= roi[0] + roi[2]
+            and top + height <= roi[1] + roi[3]
+        )
+
+    def _get_roi(self, match: Match) -> tuple[int, int, int, int]:
+        window_left, window_top, window_width, window_height = self.window_box
+        left = max(match.box.left - STATE_ROI_MARGIN, window_left)
+        top = max(match.box.top - STATE_ROI_MARGIN, window_top)
+        right = min(
+            match.box.left + match.box.width + STATE_ROI_MARGIN,
+            window_left + window_width,
+        )
+        bottom = min(
+            match.box.top + match.box.height + STATE_ROI_MARGIN,
+            window_top + window_height,
+        )
+        return left, top, right - left, bottom - top
@@ -0,0 +1,187 @@
+"""Module for Template class and template metadata.
+
+This module decodes the reference images in static/<language> into arrays and
+holds the per-template matching settings, i.e., default confidences, matching
+methods and search regions.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import hashlib
+from pathlib import Path
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+from rf4s.controller.layout import Anchor, Rect, bottom_center, top_left
+
+DEFAULT_CONFIDENCE = 0.8
+TEMPLATE_CONFIDENCES = {
+    "mark": 0.7,
+    "fish_icon": 0.9,
+    "keep": 0.9,
+    "ready": 0.6,
+    "movement": 0.7,
+    "disconnected": 0.9,
+    "ticket": 0.9,
+    "material_slot": 0.9,
+    "make": 0.9,
+    "scrollbar": 0.97,
+    "100wear": 0.98,
+    "favorite": 0.95,
+    "pva_icon": 0.6,
+    "bait_icon": 0.6,
+    "groundbait_icon": 0.6,
+    "classic_feed_mix": 0.98,
+    "dry_feed_mix": 0.98,
+    "ticket_1": 0.95,
+    "ticket_2": 0.95,
+    "ticket_3": 0.95,
+    "ticket_5": 0.95,
+    # Fish species
+    "mackerel": 0.9,
+    "saithe": 0.9,
+    "herring": 0.9,
+    "squid": 0.9,
+    "scallop": 0.9,
+    "mussel": 0.9,
+    "perch": 0.9,
+    "shorthorn_sculpin": 0.9,
+}
+
+# Matching methods used by the OpenCV backend, see rf4s.controller.matcher.METHODS.
+# Templates with transparent pixels use "masked" unless they're listed here.
+DEFAULT_METHOD = "ccoeff"
+TEMPLATE_METHODS = {}
+
+# Search regions anchored to the game window, see rf4s.controller.layout.
+# The HUD is anchored at the bottom center of the window and dialogs at the center,
+# templates without a region are searched in the whole window instead.
+SPOOL_REGION = Rect(bottom_center(-500, -180), bottom_center(500, 0))
+TEXT_HINT_REGION = Rect(bottom_center(-640, -540), bottom_center(640, 0))
+TEMPLATE_REGIONS = {
+    "0m": SPOOL_REGION,
+    "5m": SPOOL_REGION,
+    "wheel": SPOOL_REGION,
+    "ready": TEXT_HINT_REGION,
+    "movement": TEXT_HINT_REGION,
+    "broke": TEXT_HINT_REGION,
+    "lure_is_broken": TEXT_HINT_REGION,
+    # From one third of the window height to the bottom edge
+    "keep": Rect(Anchor(0.5, 1 / 3, -480, 0), bottom_center(480, 0)),
+    "fish_icon": Rect(bottom_center(-459, -104), bottom_center(-363, -8)),
+    "bait_icon": Rect(top_left(0, 0), top_left(160, 160)),
+}
+
+
+class Template(NamedTuple):
+    """A decoded reference image.
+
+    Attributes:
+        name (str): Base name of the image.
+        bgr (np.ndarray | None): Color pixels in BGR order, shape
+            (height, width, 3), None in grayscale variants.
+        gray (np.ndarray): Grayscale pixels, shape (height, width).
+        mask (np.ndarray | None): Opaque pixels of the image, None if it has no
+            transparent pixels.
+        confidence (float): Default matching confidence.
+        method (str): Matching method of the OpenCV backend.
+        region (Rect | None): Search region anchored to the game window, None if
+            it's searched in the whole window.
+        hash (str): SHA-256 digest of the image file.
+    """
+
+    name: str
+    bgr: np.ndarray | None
+    gray: np.ndarray
+    mask: np.ndarray | None
+    confidence: float
+    method: str
+    region: Rect | None
+    hash: str
+
+
+def get_template_method(name: str, mask: np.ndarray | None) -> str:
+    """Get the matching method of a template.
+
+    :param name: Base name of the image.
+    :type name: str
+    :param mask: Opaque pixels of the image, None if it has no transparent pixels.
+    :type mask: np.ndarray | None
+    :return: Name of the matching method.
+    :rtype: str
+    """
+    if name in TEMPLATE_METHODS:
+        return TEMPLATE_METHODS[name]
+    return DEFAULT_METHOD if mask is None else "masked"
+
+
+def load_template(path: Path) -> Template:
+    """Decode an image file into a template.
+
+    The file is decoded from memory because cv2.imread doesn't support non-ASCII
+    paths on Windows.
+
+    :param path: Path of the image file.
+    :type path: Path
+    :return: Decoded template.
+    :rtype: Template
+    """
+    content = path.read_bytes()
+    buffer = np.frombuffer(content, dtype=np.uint8)
+    # Decode separately to match the conversion used by pyscreeze
+    gray = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+    bgr = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if gray is None or bgr is None:
+        raise IOError(f"Failed to decode image: {path}")
+
+    mask = None
+    unchanged = cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+    if unchanged.ndim == 3 and unchanged.shape[2] == 4:
+        alpha = unchanged[:, :, 3]
+        if (alpha < 255).any():
+            mask = np.ascontiguousarray(np.where(alpha > 0, 255, 0).astype(np.uint8))
+
+    return Template(
+        path.stem,
+        np.ascontiguousarray(bgr),
+        np.ascontiguousarray(gray),
+        mask,
+        TEMPLATE_CONFIDENCES.get(path.stem, DEFAULT_CONFIDENCE),
+        get_template_method(path.stem, mask),
+        TEMPLATE_REGIONS.get(path.stem),
+        hashlib.sha256(content).hexdigest(),
+    )
+
+
+def scale_template(
+    template: Template, scale: float, color_mode: str = "bgr"
+) -> Template:
+    """Resize a template to match a HUD drawn at a different size.
+
+    :param template: Template at the reference size.
+    :type template: Template
+    :param scale: Size of the HUD relative to the reference images.
+    :type scale: float
+    :param color_mode: Pixels to keep, "gray" drops the color ones,
+        defaults to "bgr".
+    :type color_mode: str, optional
+    :return: The resized template.
+    :rtype: Template
+    """
+    height, width = template.gray.shape
+    size = (max(round(width * scale), 1), max(round(height * scale), 1))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    mask = template.mask
+    if mask is not None:
+        mask = cv2.resize(mask, size, interpolation=cv2.INTER_NEAREST)
+    bgr = None
+    if color_mode == "bgr":
+        bgr = cv2.resize(template.bgr, size, interpolation=interpolation)
+    return template._replace(
+        bgr=bgr,
+        gray=cv2.resize(template.gray, size, interpolation=interpolation),
+        mask=mask,
+        hash=f"{template.hash}@{scale}",
+    )
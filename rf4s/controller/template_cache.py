@@ -0,0 +1,128 @@
+"""Module for TemplateCache class.
+
+Resizing a template for another HUD scale costs far more than matching it, and a
+scale change would otherwise resize every template again. This module keeps the
+resized variants in one least-recently-used cache per process, bounded by a
+memory budget and shared by every Detection instance.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import logging
+from collections import OrderedDict
+
+from rf4s.controller.template import Template, scale_template
+
+logger = logging.getLogger("rich")
+
+DEFAULT_BUDGET = 64 * 1024 * 1024  # Bytes
+COLOR_MODES = ("bgr", "gray")
+
+
+def get_size(template: Template) -> int:
+    """Get the memory used by the arrays of a template.
+
+    :param template: Template to measure.
+    :type template: Template
+    :return: Number of bytes.
+    :rtype: int
+    """
+    arrays = (template.bgr, template.gray, template.mask)
+    return sum(array.nbytes for array in arrays if array is not None)
+
+
+class TemplateCache:
+    """Resized template variants with least-recently-used eviction.
+
+    Attributes:
+        budget (int): Maximum number of bytes held by the variants.
+        size (int): Number of bytes currently held by the variants.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that resized a template.
+        evictions (int): Number of variants dropped to stay within the budget.
+    """
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        """Initialize an empty cache.
+
+        :param budget: Maximum number of bytes, defaults to DEFAULT_BUDGET.
+        :type budget: int, optional
+        """
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._variants = OrderedDict()  # Keyed by (template hash, scale, color mode)
+
+    def get(
+        self, template: Template, scale: float, color_mode: str = "gray"
+    ) -> Template:
+        """Get a template resized to a HUD scale, resize it on a miss.
+
+        :param template: Template at the reference size.
+        :type template: Template
+        :param scale: Size of the HUD relative to the reference images.
+        :type scale: float
+        :param color_mode: Pixels to keep, "bgr" or "gray", defaults to "gray".
+        :type color_mode: str, optional
+        :return: The resized template.
+        :rtype: Template
+        """
+        key = (template.hash, scale, color_mode)
+        variant = self._variants.get(key)
+        if variant is not None:
+            self.hits += 1
+            self._variants.move_to_end(key)
+            return variant
+
+        self.misses += 1
+        variant = scale_template(template, scale, color_mode)
+        logger.debug("Resized template '%s' to scale %s", template.name, scale)
+        variant_size = get_size(variant)
+        if variant_size <= self.budget:
+            self._variants[key] = variant
+            self.size += variant_size
+            self._evict()
+        return variant
+
+    def set_budget(self, budget: int) -> None:
+        """Change the memory budget, evicting variants if it shrinks.
+
+        :param budget: Maximum number of bytes.
+        :type budget: int
+        """
+        self.budget = budget
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop the least recently used variants until the budget is met."""
+        while self.size > self.budget:
+            (_, scale, _), variant = self._variants.popitem(last=False)
+            self.size -= get_size(variant)
+            self.evictions += 1
+            logger.debug("Evicted template '%s' at scale %s", variant.name, scale)
+
+    def clear(self) -> None:
+        """Drop all variants and reset the counters."""
+        self._variants.clear()
+        self.size = self.hits = self.misses = self.evictions = 0
+
+    def log_stats(self) -> None:
+        """Log the hit rate and memory usage, if the cache has been used."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return
+        logger.info(
+            "Template cache: %d hits, %d misses (%.1f%% hit rate), "
+            "%d evictions, %.1f/%.1f MiB",
+            self.hits,
+            self.misses,
+            self.hits / lookups * 100,
+            self.evictions,
+            self.size / 2**20,
+            self.budget / 2**20,
+        )
+
+
+template_cache = TemplateCache()
@@ -16,6 +16,8 @@ import pyautogui as pag
 import win32con
 import win32gui
 
+from rf4s.controller.layout import is_size_supported
+
 logger = logging.getLogger("rich")
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -94,6 +96,16 @@ class Window:
         height = bottom - top
         return base_x, base_y, width, height
 
+    def get_current_box(self) -> tuple[int, int, int, int]:
+        """Query the coordinates and dimensions of the game window again.
+
+        Unlike box, which is recorded at startup, this reflects moving or resizing.
+
+        :return: Tuple containing (x, y, width, height) of the game window.
+        :rtype: tuple[int, int, int, int]
+        """
+        return self._get_box()
+
     def activate_script_window(self) -> None:
         """Focus terminal."""
         pag.press("alt")
@@ -116,9 +128,7 @@ class Window:
         :return: True if the window size is supported, False otherwise.
         :rtype: bool
         """
-        if self.box[2:] in ((2560, 1440), (1920, 1080), (1600, 900)):
-            return True
-        return False
+        return is_size_supported(self.box[2:])
 
     def save_screenshot(self, time) -> None:
         """Save a screenshot of the game window to the screenshots directory.
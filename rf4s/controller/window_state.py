@@ -0,0 +1,39 @@
+"""Module for WindowState class.
+
+Cached boxes, anchors and signatures are absolute screen coordinates of the game
+window, so they're invalid once it's moved or resized. This module keeps the window
+box that such state belongs to and drops the state when the box changes.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+
+class WindowState:
+    """Base class of state that belongs to a game window box.
+
+    Attributes:
+        window_box (tuple[int, int, int, int] | None): Window box the state
+            belongs to, None if it hasn't been validated yet.
+    """
+
+    def __init__(self):
+        """Initialize the state without a window box."""
+        self.window_box = None
+
+    def validate(self, window_box: tuple[int, int, int, int]) -> None:
+        """Drop the state if the window has been moved or resized.
+
+        :param window_box: Current window box (left, top, width, height).
+        :type window_box: tuple[int, int, int, int]
+        """
+        window_box = tuple(window_box)
+        if window_box != self.window_box:
+            self.clear()
+            self.window_box = window_box
+
+    def clear(self) -> None:
+        """Drop the state that belongs to the window box.
+
+        :raises NotImplementedError: The subclass doesn't implement it.
+        """
+        raise NotImplementedError("clear method must be implemented in subclass")
@@ -35,6 +35,8 @@ from rf4s import exceptions, utils
 from rf4s.component.friction_brake import FrictionBrake
 from rf4s.component.tackle import Tackle
 from rf4s.controller.detection import Detection
+from rf4s.controller.motion import MotionDetector
+from rf4s.controller.screen import is_possible
 from rf4s.controller.timer import Timer
 from rf4s.controller.window import Window
 
@@ -49,8 +51,11 @@ ANIMATION_DELAY = 1
 TICKET_EXPIRE_DELAY = 16
 DISCONNECTED_DELAY = 8
 WEAR_TEXT_UPDATE_DELAY = 2
+FAVORITE_ITEM_OFFSET = (-60, 190)  # From the favorite star to the lure
 BOUND = 2
 PUT_DOWN_DELAY = 4
+FLOAT_MONITOR_DELAY = 0.04  # Float camera is checked at 25 Hz
+FLOAT_TRIGGER = 4.0  # For profiles created before the setting was added
 
 SCREENSHOT_DELAY = 2
 
@@ -130,6 +135,7 @@ class Player:
         if self.cfg.ARGS.FRICTION_BRAKE:
             logger.info("Spawing new process, do not quit the script")
             self.friction_brake.monitor_process.start()
+        self.detection.start_capture()
 
         if (
             self.cfg.SELECTED.MODE not in ("telescopic", "bottom")
@@ -324,13 +330,26 @@ class Player:
             return
 
         logger.info("Refilling player stats")
+        levels = self.detection.get_stat_levels()
+        logger.info(
+            "Energy: %s, hunger: %s, comfort: %s",
+            *(
+                "unknown" if level is None else f"{level:.0%}"
+                for level in levels.values()
+            ),
+        )
         # Comfort is affected by weather, add a check to avoid over drink
-        if self.detection.is_comfort_low() and self.timer.is_tea_drinkable():
+        comfort, hunger = levels["comfort"], levels["hunger"]
+        if (
+            comfort is not None
+            and comfort < self.cfg.STAT.COMFORT_THRESHOLD
+            and self.timer.is_tea_drinkable()
+        ):
             self._access_item("tea")
             self.tea_count += 1
             sleep(ANIMATION_DELAY)
 
-        if self.detection.is_hunger_low():
+        if hunger is not None and hunger < self.cfg.STAT.HUNGER_THRESHOLD:
             self._access_item("carrot")
             self.carrot_count += 1
             sleep(ANIMATION_DELAY)
@@ -463,13 +482,28 @@ class Player:
 
     def _handle_timeout(self) -> None:
         """Handle common timeout events."""
-        if self.detection.is_tackle_broken():
+        with self.detection.snapshot():
+            # Skip the searches for screens ruled out by the current one
+            screens = self.detection.classify_screen()
+            tackle_broken = (
+                is_possible("fishing", screens) and self.detection.is_tackle_broken()
+            )
+            disconnected = (
+                is_possible("disconnected", screens)
+                and self.detection.is_disconnected()
+            )
+            ticket_expired = (
+                is_possible("ticket_expired", screens)
+                and self.detection.is_ticket_expired()
+            )
+
+        if tackle_broken:
             self.general_quit("Tackle is broken")
 
-        if self.detection.is_disconnected():
+        if disconnected:
             self.disconnected_quit()
 
-        if self.detection.is_ticket_expired():
+        if ticket_expired:
             self._handle_expired_ticket()
 
     def _handle_broken_lure(self) -> None:
@@ -578,15 +612,16 @@ class Player:
                 # Lazy skip
 
     def _monitor_float_state(self) -> None:
-        """Monitor the state of the float."""
+        """Monitor the motion of the float in the float camera."""
         logger.info("Monitoring float state")
-        reference_img = pag.screenshot(region=self.detection.float_camera_rect)
+        trigger = getattr(self.cfg.SELECTED, "FLOAT_TRIGGER", FLOAT_TRIGGER)
+        detector = MotionDetector(trigger)
         i = self.cfg.SELECTED.DRIFT_TIMEOUT
         while i > 0:
-            i = utils.sleep_and_decrease(i, self.cfg.SELECTED.CHECK_DELAY)
-            if self.detection.is_float_state_changed(reference_img):
+            if detector.update(*self.detection.get_float_camera()):
                 logger.info("Float status changed")
                 return
+            i = utils.sleep_and_decrease(i, FLOAT_MONITOR_DELAY)
 
         raise TimeoutError
 
@@ -617,21 +652,25 @@ class Player:
 
         TODO: Trophy ruffe
         """
-        if not self.detection.is_fish_captured():
+        record = self.detection.parse_catch()
+        if record is None:
             return
         logger.info("Handling fish")
         if self.cfg.ARGS.SCREENSHOT:
             self.window.save_screenshot(self.timer.get_cur_timestamp())
 
-        if self._is_fish_blacklisted():
+        if record.species in self.cfg.KEEPNET.BLACKLIST:
             pag.press("backspace")
             return
 
-        if self.detection.is_fish_marked():
+        if record.marked:
             self.marked_count += 1
         else:
             self.unmarked_count += 1
-            if self.cfg.ARGS.MARKED and not self._is_fish_whitelisted():
+            if (
+                self.cfg.ARGS.MARKED
+                and record.species not in self.cfg.KEEPNET.RELEASE_WHITELIST
+            ):
                 pag.press("backspace")
                 return
 
@@ -670,35 +709,6 @@ class Player:
         """Handle key release events."""
         sys.exit()
 
-    def _is_fish_whitelisted(self) -> bool:
-        """Check if the fish is in the whitelist.
-
-        :return: True if the fish is in the whitelist, False otherwise.
-        :rtype: bool
-        """
-        return self._is_fish_in_list(self.cfg.KEEPNET.RELEASE_WHITELIST)
-
-    def _is_fish_blacklisted(self) -> bool:
-        """Check if the fish is in the blacklist.
-
-        :return:  True if the fish is in the blacklist, False otherwise
-        :rtype: bool
-        """
-        return self._is_fish_in_list(self.cfg.KEEPNET.BLACKLIST)
-
-    def _is_fish_in_list(self, fish_species_list: tuple | list) -> bool:
-        """Check if the fish species matches any in the table.
-
-        :param fish_species_list: fish species list
-        :type fish_species_list: tuple | list
-        :return: True if the fish species matches, False otherwise
-        :rtype: bool
-        """
-        for species in fish_species_list:
-            if self.detection.is_fish_species_matched(species):
-                return True
-        return False
-
     def general_quit(self, msg: str) -> None:
         """Quit the game through the control panel.
 
@@ -931,24 +941,22 @@ class Player:
     def _replace_item(self) -> None:
         """Replace a broken item with a favorite item."""
         logger.info("Looking for favorite items")
-        favorite_item_positions = self.detection.get_favorite_item_positions()
-        while True:
-            favorite_item_position = next(favorite_item_positions, None)
-            if favorite_item_position is None:
-                pag.press("esc")
-                sleep(ANIMATION_DELAY)
-                pag.press("esc")
-                sleep(ANIMATION_DELAY)
-                self.general_quit("Favorite item not found")
-
-            # Check if the lure for replacement is already broken
-            x, y = utils.get_box_center(favorite_item_position)
-            if pag.pixel(x - 60, y + 190) != (178, 59, 30):  # Magic value #TODO
-                logger.info("Lure replaced successfully")
-                pag.moveTo(x - 60, y + 190)
-                pag.click(clicks=2, interval=0.1)
-                sleep(WEAR_TEXT_UPDATE_DELAY)
-                break
+        # Lures for replacement that are already broken are skipped
+        favorite_items = self.detection.get_favorite_items(
+            FAVORITE_ITEM_OFFSET, check_wear=True
+        )
+        if len(favorite_items) == 0:
+            pag.press("esc")
+            sleep(ANIMATION_DELAY)
+            pag.press("esc")
+            sleep(ANIMATION_DELAY)
+            self.general_quit("Favorite item not found")
+
+        x, y = favorite_items[0].tolist()
+        logger.info("Lure replaced successfully")
+        pag.moveTo(x, y)
+        pag.click(clicks=2, interval=0.1)
+        sleep(WEAR_TEXT_UPDATE_DELAY)
 
     def _put_down_tackle(self, check_miss_counts: list[int]) -> None:
         """Put down the tackle and wait for a while.
@@ -0,0 +1,75 @@
+"""Tests for reading the rainbow line meter.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from rf4s.controller.line_meter import METER_TEMPLATES, GlyphReader, LineMeter
+
+CELL_SIZE = (12, 20)  # Width and height of a digit on the synthetic meter
+
+
+def render(text: str) -> np.ndarray:
+    """Render a fixed-pitch text like the line meter.
+
+    :param text: Digits to render.
+    :type text: str
+    :return: Grayscale image of the text.
+    :rtype: np.ndarray
+    """
+    width, height = CELL_SIZE
+    image = np.zeros((height, width * len(text)), dtype=np.uint8)
+    for i, char in enumerate(text):
+        cv2.putText(
+            image,
+            char,
+            (i * width + 1, height - 3),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            255,
+            2,
+        )
+    return image
+
+
+def count_down(meter: LineMeter, start: int, end: int) -> None:
+    """Show every length from start to end, each for two frames."""
+    for length in range(start, end - 1, -1):
+        for _ in range(2):
+            meter.read(render(f"{length:03}"), learn=True)
+
+
+@pytest.fixture(name="meter")
+def fixture_meter() -> LineMeter:
+    """A meter that only knows the digits of its templates."""
+    reader = GlyphReader({text: render(text) for text in METER_TEMPLATES.values()})
+    return LineMeter(reader, 3)
+
+
+def test_meter_is_not_ready_with_template_digits(meter: LineMeter):
+    assert not meter.ready
+    assert meter.read(render("005")) is None
+
+
+def test_meter_learns_digits_from_countdown(meter: LineMeter):
+    count_down(meter, 30, 0)
+    assert meter.ready
+    assert meter.read(render("027")) == 27
+    assert meter.read(render("138")) == 138
+    assert meter.read(render("964")) == 964
+
+
+def test_meter_does_not_learn_without_learn_flag(meter: LineMeter):
+    for length in range(30, -1, -1):
+        meter.read(render(f"{length:03}"))
+    assert not meter.ready
+
+
+def test_meter_ignores_countdown_with_skipped_digits(meter: LineMeter):
+    for length in range(30, -1, -2):
+        meter.read(render(f"{length:03}"), learn=True)
+    assert not meter.ready
+
@@ -0,0 +1,108 @@
+"""Tests for the OpenCV template matching.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from rf4s.controller import matcher
+from rf4s.controller.template import Template, load_template, scale_template
+
+STATIC = Path(__file__).resolve().parents[1] / "static" / "ru"
+MASKED_TEMPLATES = ("pva_icon", "mark", "ready", "keep")
+
+
+def load_masked_template(name: str) -> Template:
+    """Load a reference image with a transparent corner.
+
+    :param name: Base name of the image.
+    :type name: str
+    :return: The template matched with the masked method.
+    :rtype: Template
+    """
+    template = load_template(STATIC / f"{name}.png")
+    mask = np.full(template.gray.shape, 255, dtype=np.uint8)
+    mask[:2, :2] = 0
+    return template._replace(mask=mask, method="masked")
+
+
+@pytest.fixture(name="background")
+def fixture_background() -> np.ndarray:
+    """Smooth noise that doesn't contain any template."""
+    noise = np.random.default_rng(2).integers(0, 256, (600, 800), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 6)
+
+
+@pytest.mark.parametrize("name", MASKED_TEMPLATES)
+def test_masked_template_rejects_background(name: str, background: np.ndarray):
+    template = load_masked_template(name)
+    assert matcher.locate(template, background, template.confidence) is None
+
+
+@pytest.mark.parametrize("name", MASKED_TEMPLATES)
+def test_masked_template_ignores_transparent_pixels(
+    name: str, background: np.ndarray
+):
+    template = load_masked_template(name)
+    height, width = template.gray.shape
+    image = background.copy()
+    image[100 : 100 + height, 200 : 200 + width] = template.gray
+    image[100:102, 200:202] = 255 - image[100:102, 200:202]
+
+    match = matcher.locate(template, image, template.confidence)
+    assert match is not None
+    assert tuple(match.box) == (200, 100, width, height)
+    assert match.score > 0.99
+
+
+@pytest.mark.parametrize("name", MASKED_TEMPLATES)
+def test_opaque_mask_scores_like_unmasked(name: str, background: np.ndarray):
+    template = load_template(STATIC / f"{name}.png")
+    opaque = template._replace(
+        mask=np.full(template.gray.shape, 255, dtype=np.uint8), method="masked"
+    )
+    np.testing.assert_allclose(
+        matcher.get_scores(opaque, background),
+        matcher.get_scores(template, background),
+        atol=1e-3,
+    )
+
+
+@pytest.mark.parametrize("name", ("0m", "5m", "100wear", "ticket_1"))
+@pytest.mark.parametrize("position", ((100, 50), (101, 51), (57, 33)))
+def test_coarse_to_fine_locates_thin_templates(
+    name: str, position: tuple[int, int], background: np.ndarray
+):
+    template = load_template(STATIC / f"{name}.png")
+    height, width = template.gray.shape
+    left, top = position
+    for image in (np.full_like(background, 40), background.copy()):
+        image[top : top + height, left : left + width] = template.gray
+        match = matcher.locate(
+            template, image, template.confidence, matcher.downscale(image)
+        )
+        assert match is not None
+        assert tuple(match.box) == (left, top, width, height)
+
+
+@pytest.mark.parametrize("name", ("favorite", "tea", "100wear", "ticket_1"))
+@pytest.mark.parametrize("scale", (0.8, 1.25))
+@pytest.mark.parametrize("color_mode", ("gray", "bgr"))
+def test_coarse_to_fine_locates_scaled_templates(
+    name: str, scale: float, color_mode: str, background: np.ndarray
+):
+    template = load_template(STATIC / f"{name}.png")
+    template = scale_template(template, scale, color_mode)
+    height, width = template.gray.shape
+    image = background.copy()
+    image[51 : 51 + height, 101 : 101 + width] = template.gray
+
+    match = matcher.locate(
+        template, image, template.confidence, matcher.downscale(image)
+    )
+    assert match is not None
+    assert tuple(match.box) == (101, 51, width, height)
@@ -24,6 +24,7 @@ from rf4s.app.app import App
 from rf4s.component.friction_brake import FrictionBrake
 from rf4s.config.config import print_cfg
 from rf4s.controller.detection import Detection
+from rf4s.controller.layout import MIN_WINDOW_SIZE
 
 EXIT = "'h'"
 RESET = "'g'"
@@ -68,14 +69,15 @@ class FrictionBrakeApp(App):
         print_cfg(self.cfg.ARGS)
         print_cfg(self.cfg.FRICTION_BRAKE)
 
-        width, height = self.window.box[:2]
+        width, height = self.window.box[2:]
         if self.window.title_bar_exist:
             logger.info("Window mode detected. Please don't move the game window")
         if not self.window.supported:
             logger.warning('Window mode must be "Borderless windowed" or "Window mode"')
             logger.critical(
-                "Invalid window size '%s', use '2560x1440', '1920x1080' or '1600x900'",
+                "Invalid window size '%s', it must be at least %s",
                 f"{width}x{height}",
+                "x".join(map(str, MIN_WINDOW_SIZE)),
             )
             sys.exit(1)
 
@@ -122,6 +122,7 @@ class CraftApp(App):
             self.window.activate_script_window()
             return
         pag.moveTo(make_button_position)
+        self.detection.start_capture()
 
         while self.detection.is_material_complete():
             logger.info("Crafting item")
@@ -145,6 +145,7 @@ class HarvestApp(App):
         """
         pag.press(str(self.cfg.KEY.DIGGING_TOOL))
         sleep(3)
+        self.detection.start_capture()
         while True:
             if self.cfg.ARGS.REFILL:
                 if self.detection.is_comfort_low() and self.timer.is_tea_drinkable():
@@ -31,6 +31,9 @@ sys.path.append(".")  # python -m module -> python file
 
 from rf4s import utils
 from rf4s.config import config
+from rf4s.controller import pack, planner
+from rf4s.controller.layout import MIN_WINDOW_SIZE
+from rf4s.controller.template_cache import template_cache
 from rf4s.controller.window import Window
 from rf4s.player import Player
 
@@ -300,8 +303,9 @@ class Rf4sApp:
     def _is_images_valid(self) -> bool:
         """Verify that all required image files exist for the selected language.
 
-        Compares files in the reference 'en' directory with those in the current
-        language directory and reports any missing files.
+        Compiles the template packs of the reference 'en' directory and the current
+        language directory if they are out of date, then compares their indexes and
+        reports any missing files.
 
         :return: Whether all required image files are present.
         :rtype: bool
@@ -310,21 +314,23 @@ class Rf4sApp:
             return True
 
         logger.info("Verifying image files")
+        image_dir = ROOT / "static" / self.cfg.SCRIPT.LANGUAGE
+        if not image_dir.is_dir():
+            logger.critical("Invalid language: '%s'", self.cfg.SCRIPT.LANGUAGE)
+            return False
+        current_index = pack.ensure_pack(image_dir)
         if self.cfg.SCRIPT.LANGUAGE == "en":
             return True
         logger.warning(
             "Language '%s' is not fully supported, consider using EN version",
             self.cfg.SCRIPT.LANGUAGE,
         )
-        image_dir = ROOT / "static" / self.cfg.SCRIPT.LANGUAGE
-        try:
-            current_images = [f.name for f in image_dir.iterdir() if f.is_file()]
-        except FileNotFoundError:
-            logger.critical("Invalid language: '%s'", self.cfg.SCRIPT.LANGUAGE)
-            return False
-        template_dir = ROOT / "static" / "en"
-        target_images = [f.name for f in template_dir.iterdir() if f.is_file()]
-        missing_images = set(target_images) - set(current_images)
+        target_index = pack.ensure_pack(ROOT / "static" / "en")
+        if current_index["hash"] == target_index["hash"]:
+            return True
+        current_images = {entry["name"] for entry in current_index["templates"]}
+        target_images = {entry["name"] for entry in target_index["templates"]}
+        missing_images = target_images - current_images
         if len(missing_images) > 0:
             logger.critical("Some images are missing, please add them manually")
             table = Table(
@@ -334,8 +340,8 @@ class Rf4sApp:
                 box=box.DOUBLE,
                 show_header=False,
             )
-            for filename in missing_images:
-                table.add_row(f"static/{self.cfg.SCRIPT.LANGUAGE}/{filename}")
+            for name in sorted(missing_images):
+                table.add_row(f"static/{self.cfg.SCRIPT.LANGUAGE}/{name}.png")
             print(table)
             return False
         return True
@@ -450,14 +456,15 @@ class Rf4sApp:
         and disables incompatible features if needed.
         """
         self.window = Window()
-        width, height = self.window.box[:2]
+        width, height = self.window.box[2:]
         if self.window.title_bar_exist:
             logger.info("Window mode detected. Please don't move the game window")
         if not self.window.supported:
             logger.warning('Window mode must be "Borderless windowed" or "Window mode"')
             logger.warning(
-                "Invalid window size '%s', use '2560x1440', '1920x1080' or '1600x900'",
+                "Invalid window size '%s', it must be at least %s",
                 f"{width}x{height}",
+                "x".join(map(str, MIN_WINDOW_SIZE)),
             )
             logger.error("Snag detection will be disabled")
             logger.error("Spooling detection will be disabled")
@@ -522,7 +529,8 @@ class Rf4sApp:
 
         Sets up all required components, activates the game window,
         registers key listeners, and begins the fishing automation.
-        Handles termination and displays results.
+        Handles termination, displays results and logs the matching statistics
+        however the player exits.
         """
         self.setup_user_profile()
         self.setup_window()
@@ -537,12 +545,15 @@ class Rf4sApp:
         try:
             self.player.start_fishing()
         except KeyboardInterrupt:
-            pass
-
-        # self.player.friction_brake_monitor_process.join()
-        print(self.player.gen_result("Terminated by user"))
-        if self.cfg.ARGS.PLOT:
-            self.player.plot_and_save()
+            # self.player.friction_brake_monitor_process.join()
+            print(self.player.gen_result("Terminated by user"))
+            if self.cfg.ARGS.PLOT:
+                self.player.plot_and_save()
+        finally:
+            # The player might also exit by sys.exit(), e.g., when the keepnet is full
+            template_cache.log_stats()
+            self.player.detection.region_memo.log_stats()
+            planner.log_stats()
 
 
 if __name__ == "__main__":
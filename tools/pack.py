@@ -0,0 +1,55 @@
+"""Compile the reference images into template packs.
+
+This module builds static/<language>.pack from static/<language>/*.png, so that
+the script can memory-map the templates at startup instead of decoding every image.
+Packs are rebuilt automatically when the images change, running this manually is
+only needed after editing the images while the script is not running.
+
+.. moduleauthor:: Derek Lee <dereklee0310@gmail.com>
+"""
+
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from rich import print
+
+sys.path.append(".")
+from rf4s.controller.pack import build_pack, get_pack_path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def main() -> None:
+    """Build the packs of all languages or the specified one."""
+    parser = ArgumentParser(description="Compile reference images into packs.")
+    parser.add_argument(
+        "-l",
+        "--language",
+        help="language directory to compile, e.g., en, defaults to all languages",
+    )
+    args = parser.parse_args()
+
+    static_dir = ROOT / "static"
+    if args.language is None:
+        image_dirs = sorted(
+            path
+            for path in static_dir.iterdir()
+            if path.is_dir() and any(path.glob("*.png"))
+        )
+    else:
+        image_dirs = [static_dir / args.language]
+
+    for image_dir in image_dirs:
+        if not image_dir.is_dir() or not any(image_dir.glob("*.png")):
+            print(f"[red]Invalid language: '{image_dir.name}'")
+            sys.exit(1)
+        index = build_pack(image_dir)
+        print(
+            f"Compiled {len(index['templates'])} images into "
+            f"{get_pack_path(image_dir).relative_to(ROOT)}"
+        )
+
+
+if __name__ == "__main__":
+    main()